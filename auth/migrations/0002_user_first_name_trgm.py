@@ -0,0 +1,22 @@
+# Generated by Django 3.2.10 on 2026-10-18 21:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gbqa_auth', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE SCHEMA IF NOT EXISTS extensions",
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA extensions",
+                "CREATE INDEX IF NOT EXISTS gbqa_auth_user_first_name_trgm "
+                "ON gbqa_auth_user USING gin (UPPER(first_name::text) gin_trgm_ops)",
+            ],
+            reverse_sql="DROP INDEX IF EXISTS gbqa_auth_user_first_name_trgm",
+        ),
+    ]
@@ -0,0 +1,88 @@
+import random
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.db import connections
+from django_tenants.utils import get_public_schema_name, get_tenant_model, schema_context
+
+
+class TenantRun:
+    def __init__(self, schema_name, result=None, elapsed=0.0, error=None):
+        self.schema_name = schema_name
+        self.result = result
+        self.elapsed = elapsed
+        self.error = error
+
+
+def get_tenant_schemas(schema_names=None):
+    queryset = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+
+    if schema_names:
+        queryset = queryset.filter(schema_name__in=schema_names)
+
+    return list(queryset.order_by('schema_name').values_list('schema_name', flat=True))
+
+
+def run_in_schema(task, schema_name, *args, not_before=None):
+    # Waiting for the start offset is not part of the run
+    if not_before is not None:
+        time.sleep(max(0.0, not_before - time.time()))
+
+    started = time.monotonic()
+
+    try:
+        with schema_context(schema_name):
+            result = task(*args)
+    except Exception:
+        return TenantRun(schema_name, elapsed=time.monotonic() - started, error=traceback.format_exc())
+
+    return TenantRun(schema_name, result=result, elapsed=time.monotonic() - started)
+
+
+def get_start_times(schema_names, stagger):
+    """
+    Return ``(schema_name, start_time)`` pairs that spread the schemas evenly over the next ``stagger``
+    seconds, shuffled so the same tenant does not always start last. Start times are None without stagger.
+    """
+    if not stagger or not schema_names:
+        return [(schema_name, None) for schema_name in schema_names]
+
+    now = time.time()
+    step = stagger / len(schema_names)
+
+    return [
+        (schema_name, now + index * step)
+        for index, schema_name in enumerate(random.sample(schema_names, len(schema_names)))
+    ]
+
+
+def run_for_tenants(task, schema_names, *args, workers=1, stagger=0):
+    """
+    Run ``task(*args)`` once inside every schema in ``schema_names`` and yield a TenantRun per schema as
+    it finishes.
+
+    With more than one worker the schemas are spread over a process pool. ``task`` must then be a module
+    level function. Connections are closed before the pool forks, so every worker opens its own.
+
+    With ``stagger`` the schemas start at offsets spread over that many seconds, so they do not all hit the
+    database at once. A schema whose offset has passed while earlier ones ran starts right away, so the
+    offsets never add up to more than ``stagger``.
+    """
+    start_times = get_start_times(schema_names, stagger)
+
+    if workers <= 1:
+        for schema_name, start_time in start_times:
+            yield run_in_schema(task, schema_name, *args, not_before=start_time)
+
+        return
+
+    connections.close_all()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_in_schema, task, schema_name, *args, not_before=start_time)
+            for schema_name, start_time in start_times
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
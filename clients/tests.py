@@ -1,3 +1,24 @@
-from django.test import TestCase
+import time
+from django_tenants.test.cases import TenantTestCase
+from .runner import get_start_times, run_in_schema
 
-# Create your tests here.
+
+class RunnerTestCase(TenantTestCase):
+    def test_start_times_spread_over_stagger(self):
+        schema_names = ['a', 'b', 'c', 'd']
+        start_times = get_start_times(schema_names, 20)
+        offsets = sorted(start_time - start_times[0][1] for _, start_time in start_times)
+
+        self.assertEqual(sorted(schema_name for schema_name, _ in start_times), schema_names)
+        self.assertEqual([round(offset) for offset in offsets], [0, 5, 10, 15])
+
+    def test_no_stagger_keeps_order(self):
+        self.assertEqual(get_start_times(['a', 'b'], 0), [('a', None), ('b', None)])
+
+    def test_wait_is_not_timed(self):
+        started = time.time()
+        run = run_in_schema(lambda: 'done', self.tenant.schema_name, not_before=started + 0.3)
+
+        self.assertEqual(run.result, 'done')
+        self.assertGreaterEqual(time.time() - started, 0.3)
+        self.assertLess(run.elapsed, 0.3)
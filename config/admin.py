@@ -12,7 +12,7 @@ class NationalityAdmin(admin.ModelAdmin):
 
 
 class FineAdmin(admin.ModelAdmin):
-    list_display = ('detail', 'amount')
+    list_display = ('detail', 'amount', 'threshold', 'distributor_type')
     ordering = ('amount',)
     search_fields = ('detail',)
 
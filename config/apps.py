@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ConfigConfig(AppConfig):
     name = 'config'
+
+    def ready(self):
+        from gbqa import reference
+        from .fines import invalidate
+        from .models import Fine, Nationality
+
+        post_save.connect(invalidate, sender=Fine, dispatch_uid='fine_rules_save')
+        post_delete.connect(invalidate, sender=Fine, dispatch_uid='fine_rules_delete')
+
+        for model in [Fine, Nationality]:
+            name = model._meta.model_name
+            post_save.connect(reference.invalidate_shared, sender=model, dispatch_uid='reference_%s_save' % name)
+            post_delete.connect(reference.invalidate_shared, sender=model, dispatch_uid='reference_%s_delete' % name)
@@ -0,0 +1,112 @@
+import threading
+from bisect import bisect_right
+from django.core.cache import cache
+from gbqa.versions import bump_version, get_version
+from .models import Fine
+
+VERSION_NAMESPACE = 'fines'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+_local = {}
+_lock = threading.Lock()
+
+
+def compile_rules():
+    """
+    Group the fines that have a threshold by distributor type name (None for the default rules) into
+    parallel tuples of ascending thresholds and amounts.
+    """
+    tiers = {}
+    rows = Fine.objects.filter(threshold__isnull=False).order_by('threshold', 'id').values_list(
+        'distributor_type', 'threshold', 'amount'
+    )
+
+    for distributor_type, threshold, amount in rows:
+        thresholds, amounts = tiers.setdefault(distributor_type or None, ([], []))
+
+        # The first fine wins when two share a threshold
+        if not thresholds or thresholds[-1] != threshold:
+            thresholds.append(threshold)
+            amounts.append(amount)
+
+    return {
+        distributor_type: (tuple(thresholds), tuple(amounts))
+        for distributor_type, (thresholds, amounts) in tiers.items()
+    }
+
+
+def get_rules():
+    version = get_version(VERSION_NAMESPACE, scoped=False)
+
+    with _lock:
+        entry = _local.get(VERSION_NAMESPACE)
+
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    shared_key = 'fines:rules:%s' % version
+    rules = cache.get(shared_key)
+
+    if rules is None:
+        rules = compile_rules()
+        cache.set(shared_key, rules, CACHE_TIMEOUT)
+
+    with _lock:
+        _local[VERSION_NAMESPACE] = (version, rules)
+
+    return rules
+
+
+def get_tiers(distributor_type, rules=None):
+    """
+    Rules of a distributor type replace the default rules, they are not merged with them.
+    """
+    rules = get_rules() if rules is None else rules
+
+    return rules.get(distributor_type) or rules.get(None) or ((), ())
+
+
+def get_fine(distributor_type, mark, rules=None):
+    """
+    Return the fine for an inspection with ``mark``: the amount of the lowest threshold above the mark,
+    or None when the mark is not below any threshold.
+    """
+    thresholds, amounts = get_tiers(distributor_type, rules)
+    index = bisect_right(thresholds, mark)
+
+    return amounts[index] if index < len(thresholds) else None
+
+
+def get_fine_sql(type_column, mark_column, rules=None):
+    """
+    Return the rules as an SQL CASE expression over ``type_column`` and ``mark_column`` and its params,
+    to price many rows in one statement.
+    """
+    rules = get_rules() if rules is None else rules
+    sql = []
+    params = []
+
+    def tiers_sql(thresholds, amounts):
+        if not thresholds:
+            return 'NULL'
+
+        for threshold, amount in zip(thresholds, amounts):
+            params.extend([threshold, amount])
+
+        return 'CASE %s END' % ' '.join(['WHEN %s < %%s THEN %%s' % mark_column] * len(thresholds))
+
+    for distributor_type, (thresholds, amounts) in sorted(rules.items(), key=lambda item: item[0] or ''):
+        if distributor_type is not None:
+            params.append(distributor_type)
+            sql.append('WHEN %s = %%s THEN %s' % (type_column, tiers_sql(thresholds, amounts)))
+
+    default = tiers_sql(*rules.get(None, ((), ())))
+
+    if not sql:
+        return default, params
+
+    return 'CASE %s ELSE %s END' % (' '.join(sql), default), params
+
+
+def invalidate(**kwargs):
+    bump_version(VERSION_NAMESPACE, scoped=False)
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+def create_default_rule(apps, schema_editor):
+    # Keep the fine that used to be hard-coded in the submission path
+    Fine = apps.get_model('config', 'Fine')
+
+    if not Fine.objects.filter(threshold__isnull=False).exists():
+        Fine.objects.create(amount=500, detail='Visit score below 80%', threshold=80)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fine',
+            name='distributor_type',
+            field=models.CharField(blank=True, help_text='Distributor type name, or empty for every other type', max_length=48, null=True),
+        ),
+        migrations.AddField(
+            model_name='fine',
+            name='threshold',
+            field=models.IntegerField(blank=True, help_text='Generated for inspections with a total mark below this value', null=True),
+        ),
+        migrations.RunPython(create_default_rule, migrations.RunPython.noop),
+    ]
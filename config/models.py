@@ -16,6 +16,10 @@ class Nationality(models.Model):
 class Fine(models.Model):
     amount = models.IntegerField()
     detail = models.CharField(max_length=128, null=True, blank=True)
+    threshold = models.IntegerField(
+        null=True, blank=True, help_text='Generated for inspections with a total mark below this value')
+    distributor_type = models.CharField(
+        max_length=48, null=True, blank=True, help_text='Distributor type name, or empty for every other type')
 
     def __str__(self):
         return self.detail
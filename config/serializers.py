@@ -11,4 +11,4 @@ class NationalitySerializer(serializers.ModelSerializer):
 class FineSerializer(serializers.ModelSerializer):
     class Meta:
         model = Fine
-        fields = ['id', 'amount', 'detail']
+        fields = ['id', 'amount', 'detail', 'threshold', 'distributor_type']
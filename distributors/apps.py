@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class DistributorsConfig(AppConfig):
     name = 'distributors'
+
+    def ready(self):
+        from gbqa import reference
+        from .models import City, DistributorType
+
+        for model in [City, DistributorType]:
+            name = model._meta.model_name
+            post_save.connect(reference.invalidate, sender=model, dispatch_uid='reference_%s_save' % name)
+            post_delete.connect(reference.invalidate, sender=model, dispatch_uid='reference_%s_delete' % name)
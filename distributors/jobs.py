@@ -0,0 +1,44 @@
+from users.serializers import UserCreateSerializer
+from .models import Distributor
+from .views import DistributorListCreateAPIView
+
+
+def generate_users():
+    """
+    Create the login user and distributor key of every distributor that does not have one yet. The
+    validation errors of the users that could not be created are returned by distributor id.
+    """
+    distributors = list(Distributor.objects.filter(distributor_key=None))
+    numbers = Distributor.key_numbers.allocate(len(distributors))
+    errors = {}
+
+    for distributor, number in zip(distributors, numbers):
+        key = DistributorListCreateAPIView.get_distributor_key(number)
+
+        # Create Distributor User
+        user_serializer = UserCreateSerializer(data={
+            'name': distributor.name,
+            'email': key + '@gbqa-dist.com',
+            'password': 'SomethingElse',
+            'password_confirmation': 'SomethingElse',
+            'address': distributor.address if distributor.address is not None else 'Address',
+            'role': 'distributor',
+        })
+
+        if not user_serializer.is_valid():
+            errors[str(distributor.pk)] = user_serializer.errors
+
+            continue
+
+        distributor_user = user_serializer.save()
+
+        # Create distributor key
+        distributor.distributor_key = key
+        distributor.distributor_user = distributor_user
+        distributor.save()
+
+    return {
+        'users': len(distributors) - len(errors),
+        'failed': len(errors),
+        'errors': errors
+    }
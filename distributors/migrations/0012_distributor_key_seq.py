@@ -0,0 +1,21 @@
+# Generated by Django 3.2.10 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distributors', '0011_distributor_distributor_key'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE SEQUENCE IF NOT EXISTS distributors_distributor_key_seq",
+                "SELECT setval('distributors_distributor_key_seq', "
+                "COALESCE((SELECT MAX(id) FROM distributors_distributor), 0) + 1, false)",
+            ],
+            reverse_sql="DROP SEQUENCE IF EXISTS distributors_distributor_key_seq",
+        ),
+    ]
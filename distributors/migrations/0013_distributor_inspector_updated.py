@@ -0,0 +1,17 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distributors', '0012_distributor_key_seq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='distributor',
+            index=models.Index(fields=['inspector', 'updated'], name='distributor_inspect_62632f_idx'),
+        ),
+    ]
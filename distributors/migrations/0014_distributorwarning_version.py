@@ -0,0 +1,18 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distributors', '0013_distributor_inspector_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='distributorwarning',
+            name='version',
+            field=models.IntegerField(default=1),
+        ),
+    ]
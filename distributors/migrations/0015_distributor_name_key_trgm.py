@@ -0,0 +1,26 @@
+# Generated by Django 3.2.10 on 2026-10-18 21:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gbqa_auth', '0002_user_first_name_trgm'),
+        ('distributors', '0014_distributorwarning_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE INDEX IF NOT EXISTS distributors_distributor_name_trgm "
+                "ON distributors_distributor USING gin (UPPER(name::text) gin_trgm_ops)",
+                "CREATE INDEX IF NOT EXISTS distributors_distributor_key_trgm "
+                "ON distributors_distributor USING gin (UPPER(distributor_key::text) gin_trgm_ops)",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS distributors_distributor_name_trgm",
+                "DROP INDEX IF EXISTS distributors_distributor_key_trgm",
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.10 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+def rekey_duplicates(apps, schema_editor):
+    """
+    Move the key sequence past every numeric key issued with time padding, so new keys cannot repeat them,
+    and give every distributor but the first of a repeated key a new one.
+    """
+    Distributor = apps.get_model('distributors', 'Distributor')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval('distributors_distributor_key_seq', GREATEST(last_value, COALESCE(("
+            "SELECT MAX(SUBSTRING(distributor_key FROM 9)::bigint) FROM distributors_distributor "
+            "WHERE distributor_key ~ '^gb-dist-[0-9]{1,8}$'), 0))) FROM distributors_distributor_key_seq"
+        )
+
+        seen = set()
+
+        for distributor in Distributor.objects.exclude(distributor_key=None).order_by('pk'):
+            if distributor.distributor_key in seen:
+                cursor.execute("SELECT nextval('distributors_distributor_key_seq')")
+                distributor.distributor_key = 'gb-dist-' + str(cursor.fetchone()[0]).zfill(6)
+                distributor.save(update_fields=['distributor_key'])
+
+            seen.add(distributor.distributor_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distributors', '0015_distributor_name_key_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='distributor',
+            name='distributor_key',
+            field=models.CharField(default=None, max_length=16, null=True, unique=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from photo.models import Photo
 from auth.models import User
+from gbqa.sequences import SequenceAllocator
 
 
 class City(models.Model):
@@ -57,7 +58,7 @@ class Distributor(models.Model):
     city = models.ForeignKey(City, on_delete=models.SET_NULL, null=True)
     location_lat = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
     location_lng = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
-    distributor_key = models.CharField(max_length=16, default=None, null=True)
+    distributor_key = models.CharField(max_length=16, default=None, null=True, unique=True)
     distributor_user = models.ForeignKey(User, related_name='distributor_user', on_delete=models.SET_NULL, null=True)
     contact_name = models.CharField(max_length=60, default=None, null=True)
     contact_email = models.CharField(max_length=60, default=None, null=True)
@@ -74,9 +75,16 @@ class Distributor(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    key_numbers = SequenceAllocator('distributors_distributor_key_seq')
+
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['inspector', 'updated']),
+        ]
+
 
 class DistributorWarning(models.Model):
     # STATUS CHOICES
@@ -121,6 +129,7 @@ class DistributorWarning(models.Model):
     status = models.IntegerField(choices=STATUS_CHOICES, null=True)
     is_final = models.BooleanField(default=False)
     notifications = models.ManyToManyField('inspections.InspectionNotification')
+    version = models.IntegerField(default=1)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from gbqa.serializers import DynamicFieldsMixin
 from users.serializers import UserGenericSerializer
 from .models import City, DistributorType, Distributor, DistributorWarning, WarningLog
 
@@ -36,6 +37,16 @@ class DistributorGenericSerializer(serializers.ModelSerializer):
         depth = 1
 
 
+class DistributorChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Distributor
+        fields = [
+            'id', 'name', 'distributor_key', 'distributor_type', 'address', 'city', 'location_lat', 'location_lng',
+            'contact_name', 'contact_mobile', 'visit_frequency', 'language_preferences', 'total_visits', 'ratings',
+            'created', 'updated'
+        ]
+
+
 class DistributorListSerializer(serializers.ModelSerializer):
     distributor_parent = DistributorParentSerializer()
     distributor_user = UserGenericSerializer()
@@ -92,7 +103,7 @@ class DistributorDetailSerializer(serializers.ModelSerializer):
         return instance
 
 
-class DistributorWarningSerializer(serializers.ModelSerializer):
+class DistributorWarningSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = DistributorWarning
         fields = '__all__'
@@ -1,3 +1,107 @@
-from django.test import TestCase
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from auth.models import User
+from config.models import Nationality
+from gbqa.fast import get_compiled_serializer
+from gbqa.renderers import dumps
+from photo.models import Photo
+from .models import City, Distributor, DistributorType, DistributorWarning
+from .serializers import DistributorGenericSerializer, DistributorListSerializer
+from .views import DistributorListCreateAPIView
 
-# Create your tests here.
+
+class DistributorKeyTestCase(TenantTestCase):
+    def setUp(self):
+        self.distributor_type = DistributorType.objects.create(name='Shop')
+
+    def create_distributor(self, key):
+        return Distributor.objects.create(
+            name='Distributor', distributor_type=self.distributor_type, distributor_key=key,
+            visit_frequency=Distributor.FREQUENCY_DAILY, language_preferences='EN'
+        )
+
+    def test_key_is_zero_padded_sequence_value(self):
+        self.assertEqual(DistributorListCreateAPIView.get_distributor_key(42), 'gb-dist-000042')
+        self.assertEqual(DistributorListCreateAPIView.get_distributor_key(1234567), 'gb-dist-1234567')
+
+    def test_keys_from_the_sequence_differ(self):
+        keys = {DistributorListCreateAPIView.get_distributor_key() for _ in range(5)}
+
+        self.assertEqual(len(keys), 5)
+
+    def test_key_is_unique(self):
+        self.create_distributor('gb-dist-000001')
+        self.create_distributor(None)
+        self.create_distributor(None)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_distributor('gb-dist-000001')
+
+
+class CompiledListTestCase(TenantTestCase):
+    def setUp(self):
+        photo = Photo.objects.create(name='Photo', attachment='photo_files/photo.jpg')
+        manager = User.objects.create(username='manager@test.com', first_name='Manager', photo=photo)
+        distributor_type = DistributorType.objects.create(name='Shop', photo=photo)
+        parent = Distributor.objects.create(
+            name='Parent', distributor_type=distributor_type, visit_frequency=Distributor.FREQUENCY_WEEKLY,
+            language_preferences='AR'
+        )
+        Distributor.objects.create(
+            name='Distributor', distributor_type=distributor_type, distributor_parent=parent,
+            city=City.objects.create(name='City'), contact_nationality=Nationality.objects.create(name='Nationality'),
+            account_manager=manager, inspector=manager, location_lat='25.276987', location_lng='55.296249',
+            visit_frequency=Distributor.FREQUENCY_DAILY, language_preferences='EN', ratings=7.5
+        )
+
+    def assertRendersAlike(self, serializer_class):
+        request = Request(APIRequestFactory().get('/api/distributors/', HTTP_HOST=self.get_test_tenant_domain()))
+        context = {'request': request}
+        queryset = Distributor.objects.order_by('pk')
+        serializer = serializer_class(queryset, many=True, context=context)
+        compiled = get_compiled_serializer(serializer, Distributor)
+
+        self.assertIsNotNone(compiled)
+        self.assertEqual(dumps(compiled.render(compiled.values(queryset), context)), dumps(serializer.data))
+
+    def test_list(self):
+        self.assertRendersAlike(DistributorListSerializer)
+
+    def test_generic(self):
+        self.assertRendersAlike(DistributorGenericSerializer)
+
+
+class WarningActionTestCase(TenantTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin@test.com', first_name='Admin', is_superuser=True)
+        distributor = Distributor.objects.create(
+            name='Distributor', distributor_type=DistributorType.objects.create(name='Shop'),
+            visit_frequency=Distributor.FREQUENCY_DAILY, language_preferences='EN'
+        )
+        self.warning = DistributorWarning.objects.create(
+            distributor=distributor, amount=500, type=DistributorWarning.TYPE_GENERATED,
+            status=DistributorWarning.STATUS_QA_APPROVED
+        )
+        self.client = APIClient(HTTP_HOST=self.get_test_tenant_domain())
+        self.client.force_authenticate(self.user)
+
+    def act(self, **data):
+        return self.client.put(reverse('distributor-warnings-action', args=[self.warning.pk]), data, format='json')
+
+    def test_awb_without_image(self):
+        response = self.act(action='account_awb', awb_no='AWB 1')
+        self.warning.refresh_from_db()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.warning.status, DistributorWarning.STATUS_ACCOUNT_APPROVED)
+
+    def test_unknown_photo_is_rejected(self):
+        response = self.act(action='account_awb', awb_no='AWB 1', awb_image=999)
+        self.warning.refresh_from_db()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'Photo not found'})
+        self.assertEqual(self.warning.status, DistributorWarning.STATUS_QA_APPROVED)
@@ -4,8 +4,9 @@ from .views import (
     CityListAPIView,
     DistributorTypeListView,
     DistributorListCreateAPIView,
+    DistributorLookupAPIView,
     DistributorRetrieveUpdateDestroyAPIView,
-    DistributorUserGenerateAPIView,
+    DistributorStatsAPIView,
     DistributorWarningListAPIView,
     DistributorWarningLogListView,
     DistributorWarningActionUpdateAPIView
@@ -15,8 +16,9 @@ urlpatterns = [
     path('cities/', CityListAPIView.as_view()),
     path('types/', DistributorTypeListView.as_view()),
     path('distributors/', DistributorListCreateAPIView.as_view(), name='distributors_list'),
-    path('distributors/generate/', DistributorUserGenerateAPIView.generate, name='distributor_user_generate'),
+    path('distributors/lookup', DistributorLookupAPIView.as_view(), name='distributors_lookup'),
     path('distributors/<pk>', DistributorRetrieveUpdateDestroyAPIView.as_view(), name='distributors_detail'),
+    path('distributors/<pk>/stats', DistributorStatsAPIView.as_view(), name='distributors_stats'),
 
     path('warnings/', DistributorWarningListAPIView.as_view()),
     path('warnings/<pk>/logs', DistributorWarningLogListView.as_view()),
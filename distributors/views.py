@@ -1,14 +1,16 @@
-import time
+from datetime import date
+from django.db import transaction
 from rest_framework import permissions, filters
 from rest_framework.response import Response
 from rest_framework.generics import (
     ListAPIView,
     ListCreateAPIView,
+    RetrieveAPIView,
     UpdateAPIView,
     RetrieveUpdateDestroyAPIView
 )
-from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status
+from photo.models import Photo
 from .models import City, DistributorType, Distributor, DistributorWarning, WarningLog
 from .serializers import (
     CitySerializer,
@@ -25,20 +27,26 @@ from .filters import (
     DistributorWarningFilterSet,
     WarningLogFilterSet
 )
-from photo.models import Photo
+from gbqa.concurrency import VersionConflict, parse_version, reference_exists, transition
+from gbqa.mixins import (
+    CompiledSerializerMixin, ConditionalGetMixin, QueryPlanMixin, StreamingListMixin, TypeaheadMixin
+)
+from inspections.stats import get_stats
+from inspections.models import Tombstone
+from inspections.tombstones import record_unassigned
 import django_excel as excel
 from django.template.loader import get_template
 from django.core.mail import EmailMessage
 from users.serializers import UserCreateSerializer
 
 
-class CityListAPIView(ListAPIView):
+class CityListAPIView(QueryPlanMixin, ListAPIView):
     queryset = City.objects.all()
     serializer_class = CitySerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
 
         return Response({
@@ -47,7 +55,7 @@ class CityListAPIView(ListAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class DistributorTypeListView(ListAPIView):
+class DistributorTypeListView(QueryPlanMixin, ListAPIView):
     queryset = DistributorType.objects.all()
     serializer_class = DistributorTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -55,7 +63,7 @@ class DistributorTypeListView(ListAPIView):
     ordering = ['pk', 'name']
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
 
         return Response({
@@ -64,7 +72,9 @@ class DistributorTypeListView(ListAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class DistributorListCreateAPIView(ListCreateAPIView):
+class DistributorListCreateAPIView(
+    ConditionalGetMixin, CompiledSerializerMixin, QueryPlanMixin, StreamingListMixin, ListCreateAPIView
+):
     queryset = Distributor.objects.filter(is_active=True)
     serializer_class = DistributorListSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -90,31 +100,37 @@ class DistributorListCreateAPIView(ListCreateAPIView):
     def list(self, request, *args, **kwargs):
         try:
             queryset = self.get_queryset()
+            not_modified = self.get_not_modified(queryset)
+
+            if not_modified is not None:
+                return not_modified
+
+            compiled = self.get_compiled_serializer(queryset.model)
+
+            if compiled is not None:
+                queryset = compiled.values(queryset)
+            else:
+                queryset = self.plan_queryset(queryset)
+
             distributor_filter = DistributorFilterSet(request.query_params, queryset=queryset)
+
+            if request.query_params.get('export') == 'true':
+                return self.export_list(data=self.serialize(distributor_filter.qs, compiled))
+
+            if request.query_params.get('pagination') == 'false':
+                return self.stream_list('distributors', distributor_filter.qs, compiled)
+
             page = self.paginate_queryset(distributor_filter.qs)
-            serializer = self.get_serializer(page, many=True)
-            paginated_data = self.get_paginated_response(serializer.data)
+            paginated_data = self.get_paginated_response(self.serialize(page, compiled))
         except ValueError as e:
             return Response({
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        if request.query_params.get('pagination') == 'false':
-            data = self.get_serializer(distributor_filter.qs, many=True).data
-            pagination = None
-        else:
-            data = paginated_data.data['results']
-            pagination = paginated_data.data['pagination']
-
-        if request.query_params.get('export') == 'true':
-            serializer = self.get_serializer(distributor_filter.qs, many=True)
-
-            return self.export_list(data=serializer.data)
-
         return Response({
             'message': 'Success',
-            'distributors': data,
-            'pagination': pagination
+            'distributors': paginated_data.data['results'],
+            'pagination': paginated_data.data['pagination']
         }, status=status.HTTP_200_OK)
 
     @staticmethod
@@ -200,27 +216,43 @@ class DistributorListCreateAPIView(ListCreateAPIView):
         }, status=status.HTTP_200_OK)
 
     @staticmethod
-    def get_distributor_key(distributor_last=None):
-        if distributor_last is None:
-            # Get latest distributor
-            distributor_last = Distributor.objects.latest('id')
+    def get_distributor_key(number=None):
+        if number is None:
+            number = Distributor.key_numbers.next()
 
-        distributor_last_id = str(distributor_last.id + 1)
+        return 'gb-dist-' + str(number).zfill(6)
 
-        key = 'gb-dist-'
 
-        if len(distributor_last_id) < 6:
-            key = key + str(round(time.time_ns() / 100))[-(6 - len(distributor_last_id)):]
+class DistributorLookupAPIView(TypeaheadMixin, ListAPIView):
+    queryset = Distributor.objects.filter(is_active=True)
+    permission_classes = [permissions.IsAuthenticated]
+    typeahead_key = 'distributors'
+    typeahead_fields = ['name', 'distributor_key']
+
+    def get_queryset(self):
+        queryset = Distributor.objects.filter(is_active=True)
+        current_user = self.request.user
 
-        return key + distributor_last_id
+        if current_user.has_perm('gbqa_auth.role__inspector'):
+            queryset = queryset.filter(inspector=current_user.pk)
 
+        return queryset
 
-class DistributorRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+    def list(self, request, *args, **kwargs):
+        return self.typeahead(self.get_queryset())
+
+
+class DistributorRetrieveUpdateDestroyAPIView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     lookup_field = 'pk'
     serializer_class = DistributorDetailSerializer
     queryset = Distributor.objects.all()
 
     def retrieve(self, request, *args, **kwargs):
+        not_modified = self.get_not_modified(self.get_queryset().filter(pk=self.kwargs[self.lookup_field]))
+
+        if not_modified is not None:
+            return not_modified
+
         instance = self.get_object()
         serializer = self.get_serializer(instance)
 
@@ -238,6 +270,8 @@ class DistributorRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        previous_inspector_id = instance.inspector_id
+
         serializer.save(
             distributor_type_id=request.data.get('distributor_type', None),
             distributor_parent_id=request.data.get('distributor_parent', None),
@@ -246,6 +280,9 @@ class DistributorRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
             inspector_id=request.data.get('inspector', None)
         )
 
+        if previous_inspector_id is not None and str(instance.inspector_id) != str(previous_inspector_id):
+            record_unassigned(Tombstone.MODEL_DISTRIBUTOR, instance.pk, previous_inspector_id)
+
         return Response({
             'message': 'Successfully updated',
             'distributor': serializer.data
@@ -267,43 +304,42 @@ class DistributorRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class DistributorUserGenerateAPIView:
-    @api_view(['GET'])
-    @permission_classes([permissions.AllowAny])
-    def generate(self):
-        distributors = Distributor.objects.filter(distributor_key=None)
-
-        for distributor in distributors:
-            key = DistributorListCreateAPIView.get_distributor_key(distributor)
-
-            # Create Distributor User
-            user_serializer = UserCreateSerializer(data={
-                'name': distributor.name,
-                'email': key + '@gbqa-dist.com',
-                'password': 'SomethingElse',
-                'password_confirmation': 'SomethingElse',
-                'address': distributor.address if distributor.address is not None else 'Address',
-                'role': 'distributor',
-            })
-
-            if not user_serializer.is_valid():
-                print(user_serializer.errors)
+class DistributorStatsAPIView(RetrieveAPIView):
+    lookup_field = 'pk'
+    permission_classes = [permissions.IsAuthenticated]
+    queryset = Distributor.objects.all()
 
-                continue
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Visit count, mean and variance of ratings and marks between ``start`` and ``end`` (this month by default).
+        """
+        instance = self.get_object()
+        today = date.today()
 
-            distributor_user = user_serializer.save()
+        try:
+            start = date.fromisoformat(request.query_params.get('start', today.replace(day=1).isoformat()))
+            end = date.fromisoformat(request.query_params.get('end', today.isoformat()))
+        except ValueError:
+            return Response({
+                'error': 'Start and end must be in YYYY-MM-DD format'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Create distributor key
-            distributor.distributor_key = key
-            distributor.distributor_user = distributor_user
-            distributor.save()
+        if start > end:
+            return Response({
+                'error': 'Start must not be after end'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
-            'counter': len(distributors)
+            'message': 'Success',
+            'stats': {
+                'start': start,
+                'end': end,
+                **get_stats([instance.pk], start, end)[instance.pk]
+            }
         }, status=status.HTTP_200_OK)
 
 
-class DistributorWarningListAPIView(ListAPIView):
+class DistributorWarningListAPIView(ConditionalGetMixin, QueryPlanMixin, ListAPIView):
     queryset = DistributorWarning.objects.all()
     serializer_class = DistributorWarningSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -343,11 +379,19 @@ class DistributorWarningListAPIView(ListAPIView):
         return queryset
 
     def list(self, request, *args, **kwargs):
+        # Exports read the nested distributor and its type
+        fieldset = {'fields': '', 'expand': '*'} if request.query_params.get('export') == 'true' else {}
         queryset = self.get_queryset()
+        not_modified = self.get_not_modified(queryset, **fieldset)
+
+        if not_modified is not None:
+            return not_modified
+
+        queryset = self.plan_queryset(queryset, **fieldset)
         item_filter = DistributorWarningFilterSet(request.query_params, queryset=queryset)
 
         if request.query_params.get('export') == 'true':
-            serializer = self.get_serializer(item_filter.qs, many=True)
+            serializer = self.get_serializer(item_filter.qs, many=True, **fieldset)
 
             return self.export_list(data=serializer.data)
 
@@ -385,7 +429,7 @@ class DistributorWarningListAPIView(ListAPIView):
         return excel.make_response(sheet, 'xlsx', 200, 'Warnings')
 
 
-class DistributorWarningLogListView(ListAPIView):
+class DistributorWarningLogListView(ConditionalGetMixin, QueryPlanMixin, ListAPIView):
     queryset = WarningLog.objects.all()
     serializer_class = DistributorWarningLogSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -398,6 +442,12 @@ class DistributorWarningLogListView(ListAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
+        not_modified = self.get_not_modified(queryset)
+
+        if not_modified is not None:
+            return not_modified
+
+        queryset = self.plan_queryset(queryset)
         warning_filter = WarningLogFilterSet(request.query_params, queryset=queryset)
         page = self.paginate_queryset(warning_filter.qs)
         serializer = self.get_serializer(page, many=True)
@@ -439,64 +489,86 @@ class DistributorWarningActionUpdateAPIView(UpdateAPIView):
                 'error': 'You are not authorized to take this action'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        instance = self.get_object()
-
-        if request.data.get('action') == 'manager_approve':
-            instance.status = DistributorWarning.STATUS_QA_APPROVED
-            instance.save()
+        if request.data.get('action') == 'manager_reject' and request.data.get('reject_reason') is None:
+            return Response({
+                'error': 'A specific reason is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Store Warning Log
-            warning_log = WarningLog(
-                distributor_warning=instance,
-                title='Approved by QA Manager',
-                subtitle='',
-                generated_by=WarningLog.GEN_BY_USER,
-                user=request.user,
-                type=WarningLog.TYPE_SUCCESS
-            )
-            warning_log.save()
-        elif request.data.get('action') == 'manager_reject':
-            if request.data.get('reject_reason') is None:
-                return Response({
-                    'error': 'A specific reason is required'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            instance.status = DistributorWarning.STATUS_REJECTED
-            instance.save()
+        try:
+            version = parse_version(request.data.get('version'))
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Version must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Store Warning Log
-            warning_log = WarningLog(
-                distributor_warning=instance,
-                title='Rejected by QA Manager',
-                subtitle=request.data.get('reject_reason'),
-                generated_by=WarningLog.GEN_BY_USER,
-                user=request.user,
-                type=WarningLog.TYPE_ERROR
-            )
-            warning_log.save()
-        elif request.data.get('action') == 'mark_final':
-            instance.is_final = True
-            instance.save()
-        elif request.data.get('action') == 'account_awb':
-            if request.data.get('awb_image'):
-                instance.awb_image = Photo.objects.get(pk=request.data.get('awb_image'))
+        image_field = {'account_awb': 'awb_image', 'finance_record': 'record_image'}.get(request.data.get('action'))
 
-            instance.awb_no = request.data.get('awb_no')
-            instance.status = DistributorWarning.STATUS_ACCOUNT_APPROVED
-            instance.save()
-        elif request.data.get('action') == 'mark_as_read':
-            instance.account_is_read = True
-            instance.save()
-        elif request.data.get('action') == 'finance_record':
-            instance.finance_manager = request.user
+        if image_field and request.data.get(image_field) and not reference_exists(Photo, request.data.get(image_field)):
+            return Response({
+                'error': 'Photo not found'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            if request.data.get('record_image'):
-                instance.record_image = Photo.objects.get(pk=request.data.get('record_image'))
+        pk = self.kwargs[self.lookup_field]
+        queryset = self.get_queryset().filter(pk=pk)
+        log = None
 
-            instance.record_no = request.data.get('record_no')
-            instance.status = DistributorWarning.STATUS_FINANCE_APPROVED
-            instance.save()
+        try:
+            with transaction.atomic():
+                if request.data.get('action') == 'manager_approve':
+                    transition(
+                        queryset, version, [DistributorWarning.STATUS_PENDING],
+                        status=DistributorWarning.STATUS_QA_APPROVED
+                    )
+
+                    log = ('Approved by QA Manager', '', WarningLog.TYPE_SUCCESS)
+                elif request.data.get('action') == 'manager_reject':
+                    transition(
+                        queryset, version, [DistributorWarning.STATUS_PENDING],
+                        status=DistributorWarning.STATUS_REJECTED
+                    )
+
+                    log = ('Rejected by QA Manager', request.data.get('reject_reason'), WarningLog.TYPE_ERROR)
+                elif request.data.get('action') == 'mark_final':
+                    transition(queryset, version, is_final=True)
+                elif request.data.get('action') == 'account_awb':
+                    changes = {'awb_no': request.data.get('awb_no')}
+
+                    if request.data.get('awb_image'):
+                        changes['awb_image_id'] = request.data.get('awb_image')
+
+                    transition(
+                        queryset, version, [DistributorWarning.STATUS_QA_APPROVED],
+                        status=DistributorWarning.STATUS_ACCOUNT_APPROVED, **changes
+                    )
+                elif request.data.get('action') == 'mark_as_read':
+                    transition(queryset, version, account_is_read=True)
+                elif request.data.get('action') == 'finance_record':
+                    changes = {'finance_manager_id': request.user.pk, 'record_no': request.data.get('record_no')}
+
+                    if request.data.get('record_image'):
+                        changes['record_image_id'] = request.data.get('record_image')
+
+                    transition(
+                        queryset, version, [DistributorWarning.STATUS_ACCOUNT_APPROVED],
+                        status=DistributorWarning.STATUS_FINANCE_APPROVED, **changes
+                    )
+
+                if log is not None:
+                    # Store Warning Log
+                    WarningLog.objects.create(
+                        distributor_warning_id=pk,
+                        title=log[0],
+                        subtitle=log[1],
+                        generated_by=WarningLog.GEN_BY_USER,
+                        user=request.user,
+                        type=log[2]
+                    )
+        except VersionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
 
         return Response({
-            'message': 'Successfully updated action'
+            'message': 'Successfully updated action',
+            'version': version + 1 if version is not None else None
         }, status=status.HTTP_200_OK)
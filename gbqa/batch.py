@@ -0,0 +1,161 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+BATCH_LIMIT = 20
+BATCH_WORKERS = 4
+BATCH_PATH = '/api/batch'
+
+METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+# Sub-responses keep only the headers a client needs to revalidate
+RESPONSE_HEADERS = ['ETag']
+
+# Headers of the batch request that are not passed on to its sub-requests
+REQUEST_META = ['CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE']
+
+
+class BatchError(Exception):
+    pass
+
+
+def parse_batch(data):
+    """
+    Read the list of ``{'method', 'url', 'body', 'headers'}`` sub-requests of a batch request.
+    """
+    items = data.get('requests') if isinstance(data, dict) else None
+
+    if not isinstance(items, list) or not items:
+        raise BatchError('Requests field is required')
+
+    if len(items) > BATCH_LIMIT:
+        raise BatchError('At most %d requests can be sent at once' % BATCH_LIMIT)
+
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('url'), str):
+            raise BatchError('Every request needs a url')
+
+        item.setdefault('method', 'GET')
+
+        if item['method'] not in METHODS:
+            raise BatchError('Method %s is not allowed' % item['method'])
+
+        path = urlsplit(item['url']).path
+
+        if not path.startswith('/api/') or path.rstrip('/') == BATCH_PATH:
+            raise BatchError('Url %s is not allowed' % item['url'])
+
+        if not isinstance(item.get('headers', {}), dict):
+            raise BatchError('Headers must be an object')
+
+    return items
+
+
+def build_request(request, item):
+    """
+    Build the sub-request of ``item`` from the batch ``request``, with its tenant and user already resolved.
+    """
+    url = urlsplit(item['url'])
+    body = json.dumps(item['body']).encode() if item.get('body') is not None else b''
+    environ = {key: value for key, value in request.META.items() if key not in REQUEST_META}
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body)
+    })
+
+    for name, value in item.get('headers', {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+
+    sub_request = WSGIRequest(environ)
+    sub_request.tenant = getattr(request, 'tenant', None)
+    sub_request.urlconf = getattr(request, 'urlconf', None)
+    sub_request.user = request.user
+
+    # Read by DRF in place of the authentication classes, so the token is not decoded again
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+
+    return sub_request
+
+
+def get_body(response):
+    if isinstance(response, Response):
+        return response.data
+
+    if response.get('Content-Type', '').startswith('application/json'):
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+
+        return json.loads(content) if content else None
+
+    return None
+
+
+def run_request(request, item):
+    sub_request = build_request(request, item)
+
+    try:
+        match = resolve(sub_request.path_info, urlconf=sub_request.urlconf)
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND, 'headers': {}, 'body': {'detail': 'Not found.'}}
+
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Exception as e:
+        response = response_for_exception(sub_request, e)
+
+    return {
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RESPONSE_HEADERS if response.has_header(name)},
+        'body': get_body(response)
+    }
+
+
+def run_in_thread(request, item):
+    connection.set_tenant(request.tenant)
+
+    try:
+        return run_request(request, item)
+    finally:
+        connection.close()
+
+
+class BatchAPIView(APIView):
+    """
+    Run up to BATCH_LIMIT API requests in one round trip.
+
+    The sub-requests are resolved against the tenant's URLs and run in-process in their order, with the
+    tenant and user of the batch request. With ``parallel`` a batch of only GET requests runs on
+    BATCH_WORKERS threads instead.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items = parse_batch(request.data)
+        except BatchError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.data.get('parallel') and all(item['method'] == 'GET' for item in items):
+            with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(items))) as executor:
+                responses = list(executor.map(lambda item: run_in_thread(request, item), items))
+        else:
+            responses = [run_request(request, item) for item in items]
+
+        return Response({
+            'message': 'Success',
+            'responses': responses
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,61 @@
+from django.db.models import F
+from django.http import Http404
+from django.utils import timezone
+
+CONFLICT_MESSAGE = 'This record was changed by someone else, please reload it and try again'
+
+
+class VersionConflict(Exception):
+    pass
+
+
+def parse_version(value):
+    """
+    Read the optional ``version`` sent by the client. Raises ValueError for anything but a positive integer.
+    """
+    if value in (None, ''):
+        return None
+
+    version = int(value)
+
+    if version < 1:
+        raise ValueError('Version must be a positive integer')
+
+    return version
+
+
+def reference_exists(model, pk):
+    """
+    Whether the row ``pk`` of ``model`` exists, False for a malformed key. Foreign keys set by ``transition``
+    are checked with it first, as the UPDATE would otherwise fail on the constraint.
+    """
+    try:
+        return model.objects.filter(pk=pk).exists()
+    except (TypeError, ValueError):
+        return False
+
+
+def transition(queryset, version=None, allowed=None, field='status', **changes):
+    """
+    Apply ``changes`` to the row selected by ``queryset`` with a single conditional UPDATE that bumps its
+    version.
+
+    The row only matches while it is still at ``version`` (when the client sent one) and while ``field`` is
+    one of the ``allowed`` prior values (when given). Raises Http404 when the row does not exist and
+    VersionConflict when it was changed or moved on in the meantime.
+    """
+    filters = {}
+
+    if version is not None:
+        filters['version'] = version
+
+    if allowed is not None:
+        filters[field + '__in'] = allowed
+
+    if queryset.filter(**filters).update(version=F('version') + 1, updated=timezone.now(), **changes):
+        return
+
+    if not queryset.exists():
+        raise Http404
+
+    raise VersionConflict(CONFLICT_MESSAGE)
@@ -0,0 +1,221 @@
+import threading
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import fields as drf_fields, serializers
+from rest_framework.settings import api_settings
+from .serializers import DISPLAY_SOURCE
+
+# Fieldsets come from the query string, so only this many compiled serializers are kept
+COMPILED_CACHE_SIZE = 256
+
+# Fields whose to_representation returns the values of these model fields unchanged
+IDENTITY_FIELDS = {
+    drf_fields.CharField: (models.CharField, models.TextField),
+    drf_fields.EmailField: (models.CharField, models.TextField),
+    drf_fields.IntegerField: (models.IntegerField,),
+    drf_fields.BooleanField: (models.BooleanField,)
+}
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+class Unsupported(Exception):
+    pass
+
+
+class CompiledSerializer:
+    """
+    Read-only form of a serializer that renders rows of ``values_list(*paths)`` into the same dicts
+    ``serializer.data`` returns, without building model instances or bound fields per row.
+    """
+
+    def __init__(self, paths, render):
+        self.paths = paths
+        self._render = render
+
+    def values(self, queryset):
+        return queryset.values_list(*self.paths)
+
+    def render(self, rows, context=None):
+        render = self._render
+        context = context or {}
+
+        return [render(row, context) for row in rows]
+
+
+def _compile(serializer, model, prefix, column):
+    """
+    Return a function of ``(row, context)`` that renders the fields of ``serializer`` over ``model`` from
+    the columns registered with ``column``. Raises Unsupported for fields that cannot be read from a row.
+    """
+    if getattr(serializer, 'Meta', None) is None or serializer.Meta.model is not model:
+        raise Unsupported(serializer)
+
+    source_fields = getattr(serializer.Meta, 'source_fields', {})
+    converters = []
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            raise Unsupported(name)
+
+        if len(field.source_attrs) != 1:
+            raise Unsupported(name)
+
+        attr = field.source_attrs[0]
+
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            model_field = None
+
+        if model_field is not None and model_field.is_relation:
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise Unsupported(name)
+
+            index = column(prefix + model_field.name)
+
+            if isinstance(field, serializers.BaseSerializer):
+                converters.append((name, _nested(index, _compile(
+                    field, model_field.related_model, prefix + model_field.name + '__', column
+                ))))
+            elif type(field) is serializers.PrimaryKeyRelatedField and field.pk_field is None:
+                converters.append((name, _identity(index)))
+            else:
+                raise Unsupported(name)
+        elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField, drf_fields.SerializerMethodField,
+                                drf_fields.HiddenField)):
+            raise Unsupported(name)
+        elif model_field is not None:
+            index = column(prefix + model_field.name)
+
+            if isinstance(field, drf_fields.FileField):
+                use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+                if not use_url or not isinstance(model_field, models.FileField):
+                    raise Unsupported(name)
+
+                converters.append((name, _file(index, model_field.storage)))
+            elif isinstance(model_field, IDENTITY_FIELDS.get(type(field), ())):
+                converters.append((name, _identity(index)))
+            else:
+                converters.append((name, _field(index, field.to_representation)))
+        elif callable(getattr(model, attr, None)):
+            match = DISPLAY_SOURCE.match(attr)
+            names = source_fields.get(name) or ([match.group(1)] if match else None)
+
+            if names is None:
+                raise Unsupported(name)
+
+            attnames = []
+
+            for dependency in names:
+                dependency_field = model._meta.get_field(dependency)
+                attnames.append((dependency_field.attname, column(prefix + dependency_field.name)))
+
+            converters.append((name, _method(model, attr, attnames, field.to_representation)))
+        else:
+            raise Unsupported(name)
+
+    def render(row, context):
+        return {name: convert(row, context) for name, convert in converters}
+
+    return render
+
+
+def _identity(index):
+    return lambda row, context: row[index]
+
+
+def _field(index, to_representation):
+    def convert(row, context):
+        value = row[index]
+
+        return None if value is None else to_representation(value)
+
+    return convert
+
+
+def _file(index, storage):
+    def convert(row, context):
+        name = row[index]
+
+        if not name:
+            return None
+
+        url = storage.url(name)
+        request = context.get('request')
+
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
+
+
+def _nested(index, render):
+    return lambda row, context: None if row[index] is None else render(row, context)
+
+
+def _method(model, attr, attnames, to_representation):
+    """
+    Call the model method ``attr`` on a bare instance holding only the columns it reads.
+    """
+    function = getattr(model, attr)
+
+    def convert(row, context):
+        instance = model.__new__(model)
+        instance.__dict__.update({attname: row[index] for attname, index in attnames})
+        value = function(instance)
+
+        return None if value is None else to_representation(value)
+
+    return convert
+
+
+def compile_serializer(serializer, model):
+    """
+    Compile ``serializer`` into a CompiledSerializer over ``model``, or return None when one of its fields
+    is not a column, a forward relation, a nested serializer of one or a model method whose columns are
+    known. Model methods read the columns listed in ``Meta.source_fields``, ``get_<field>_display`` its field.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    paths = []
+    indexes = {}
+
+    def column(path):
+        if path not in indexes:
+            indexes[path] = len(paths)
+            paths.append(path)
+
+        return indexes[path]
+
+    try:
+        render = _compile(serializer, model, '', column)
+    except Unsupported:
+        return None
+
+    return CompiledSerializer(paths, render)
+
+
+def get_compiled_serializer(serializer, model):
+    """
+    Return the compiled form of ``serializer``, compiled once per serializer class and fieldset.
+    """
+    child = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+    key = (type(child), model, repr(getattr(child, '_fieldset', None)))
+
+    with _lock:
+        if key in _compiled:
+            return _compiled[key]
+
+    compiled = compile_serializer(child, model)
+
+    with _lock:
+        if len(_compiled) < COMPILED_CACHE_SIZE:
+            _compiled[key] = compiled
+
+    return compiled
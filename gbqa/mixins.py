@@ -0,0 +1,233 @@
+import hashlib
+import threading
+from datetime import date
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import Count, Max, Q, Sum, prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from inspections.models import Tombstone
+from .fast import get_compiled_serializer
+from .renderers import stream_json
+from .serializers import get_queryset_plan
+
+# Fieldsets come from the query string, so only this many plans are kept
+PLAN_CACHE_SIZE = 256
+
+_plans = {}
+_lock = threading.Lock()
+
+
+def get_cached_plan(serializer, model):
+    """
+    Return the query plan of ``serializer`` over ``model``, computed once per serializer class and fieldset.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    key = (type(serializer), model, repr(getattr(serializer, '_fieldset', None)))
+
+    with _lock:
+        plan = _plans.get(key)
+
+    if plan is None:
+        plan = get_queryset_plan(serializer, model)
+
+        with _lock:
+            if len(_plans) < PLAN_CACHE_SIZE:
+                _plans[key] = plan
+
+    return plan
+
+
+class QueryPlanMixin:
+    """
+    List view mixin that derives ``select_related``, ``prefetch_related`` and ``only`` from the fields of the
+    view's serializer, so the number of queries of a page does not grow with its size.
+    """
+
+    def plan_queryset(self, queryset, **kwargs):
+        """
+        Apply the plan of the serializer returned by ``get_serializer(**kwargs)`` to ``queryset``.
+        """
+        select, prefetch, only = get_cached_plan(self.get_serializer(**kwargs), queryset.model)
+
+        if select:
+            queryset = queryset.select_related(*select)
+
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        if only:
+            queryset = queryset.only(*only)
+
+        return queryset
+
+
+class CompiledSerializerMixin:
+    """
+    List view mixin that reads rows with ``values_list()`` and renders them with the compiled form of the
+    view's serializer, see gbqa.fast. Views fall back to the serializer when it cannot be compiled.
+    """
+
+    def get_compiled_serializer(self, model, **kwargs):
+        return get_compiled_serializer(self.get_serializer(**kwargs), model)
+
+    def serialize(self, rows, compiled=None, **kwargs):
+        """
+        Render ``rows`` read with ``compiled.values()``, or model instances when ``compiled`` is None.
+        """
+        if compiled is not None:
+            return compiled.render(rows, self.get_serializer_context())
+
+        return self.get_serializer(rows, many=True, **kwargs).data
+
+
+class StreamingListMixin:
+    """
+    List view mixin that streams a whole queryset as the ``key`` array of the list envelope, reading and
+    rendering ``stream_chunk_size`` rows at a time.
+    """
+    stream_chunk_size = 500
+
+    def stream_list(self, key, queryset, compiled=None):
+        """
+        Stream ``queryset``, read with ``compiled.values()`` when ``compiled`` is given.
+        """
+        context = self.get_serializer_context()
+        lookups = getattr(queryset, '_prefetch_related_lookups', ())
+
+        def render(rows):
+            if compiled is not None:
+                return compiled.render(rows, context)
+
+            # iterator() skips prefetch_related, so every chunk is prefetched on its own
+            prefetch_related_objects(rows, *lookups)
+
+            return self.get_serializer(rows, many=True).data
+
+        def chunks():
+            rows = []
+
+            for row in queryset.iterator(chunk_size=self.stream_chunk_size):
+                rows.append(row)
+
+                if len(rows) == self.stream_chunk_size:
+                    yield render(rows)
+                    rows = []
+
+            yield render(rows)
+
+        return stream_json({'message': 'Success', key: None, 'pagination': None}, key, chunks())
+
+
+class TypeaheadMixin:
+    """
+    View mixin that answers picker lookups with the ``{'id', 'label'}`` of at most ``limit`` rows whose
+    ``typeahead_fields`` start with the ``q`` param, read from ``typeahead_label`` alone. The prefix match
+    is meant to be served by trigram indexes on ``UPPER(field)``.
+    """
+    typeahead_key = 'results'
+    typeahead_fields = []
+    typeahead_label = 'name'
+    typeahead_limit = 10
+    typeahead_max_limit = 50
+
+    def typeahead(self, queryset):
+        prefix = self.request.query_params.get('q', '').strip()
+
+        try:
+            limit = int(self.request.query_params.get('limit', self.typeahead_limit))
+        except ValueError:
+            return Response({
+                'error': 'Limit must be a number'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if prefix:
+            condition = Q()
+
+            for field in self.typeahead_fields:
+                condition |= Q(**{field + '__istartswith': prefix})
+
+            queryset = queryset.filter(condition)
+
+        rows = queryset.order_by(self.typeahead_label, 'pk').values_list('pk', self.typeahead_label)
+        rows = rows[:max(1, min(limit, self.typeahead_max_limit))]
+
+        return Response({
+            'message': 'Success',
+            self.typeahead_key: [{'id': pk, 'label': label} for pk, label in rows]
+        }, status=status.HTTP_200_OK)
+
+
+def _get_related_model(model, path):
+    for name in path.split('__'):
+        model = model._meta.get_field(name).related_model
+
+    return model
+
+
+def _has_field(model, name):
+    try:
+        return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+class ConditionalGetMixin:
+    """
+    View mixin that answers GET requests with ``304 Not Modified`` when the client's ETag still matches.
+
+    The ETag hashes the row count, latest ``updated`` and version total of the view's queryset, the same
+    count and latest ``updated`` of the rows of every related table the serializer renders, each read with
+    its own query over the related keys instead of one join that fans out, and the latest tombstone. The
+    tenant, the user, the query params and the current date (which the effective inspection status depends
+    on) are part of it as well. No Last-Modified is sent, as a date alone would miss deleted rows, the change
+    of date and writes within the same second.
+    """
+
+    def get_etag(self, queryset, **kwargs):
+        select, prefetch, _ = get_cached_plan(self.get_serializer(**kwargs), queryset.model)
+        queryset = queryset.order_by()
+        aggregates = {'count': Count('pk', distinct=True), 'updated': Max('updated')}
+
+        if _has_field(queryset.model, 'version'):
+            aggregates['version'] = Sum('version')
+
+        values = [queryset.aggregate(**aggregates)]
+
+        for path in sorted(set(select + prefetch)):
+            model = _get_related_model(queryset.model, path)
+
+            if _has_field(model, 'updated'):
+                values.append(model._default_manager.filter(pk__in=queryset.values(path + '__pk')).aggregate(
+                    count=Count('pk'), updated=Max('updated')
+                ))
+
+        key = [
+            connection.schema_name, self.request.user.pk, sorted(self.request.query_params.lists()),
+            date.today().isoformat(), [sorted(value.items()) for value in values],
+            Tombstone.objects.aggregate(last=Max('pk'))['last']
+        ]
+
+        return '"%s"' % hashlib.md5(repr(key).encode()).hexdigest()
+
+    def get_not_modified(self, queryset, **kwargs):
+        """
+        Return a 304 response when the client's copy of ``queryset`` is current, otherwise None. The ETag is
+        sent with the response either way.
+        """
+        self._etag = self.get_etag(queryset, **kwargs)
+
+        return get_conditional_response(self.request, etag=self._etag)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+
+        if etag is not None and response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+
+        return response
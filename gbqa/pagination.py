@@ -1,6 +1,14 @@
+import json
 import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
@@ -25,3 +33,151 @@ class CustomPagination(PageNumberPagination):
             },
             'results': data
         })
+
+
+class KeysetPagination(CustomPagination):
+    """
+    CustomPagination that seeks on the ordering of the queryset, with the primary key as the tiebreaker,
+    when the ``cursor`` param is sent, empty for the first page, so a deep page costs as much as the first
+    one given an index on the ordering columns. Cursor pages come in the same order as numbered pages.
+
+    Pages read their keys first and then their rows by primary key, so ``values_list()`` querysets can be
+    paged as well. Cursor pages are not counted: ``current_page``, ``total`` and ``last_page`` are None and
+    only the links lead to the next and previous pages. The ordering columns must not be null; querysets
+    ordered by expressions or at random are paged by number.
+    """
+    cursor_query_param = 'cursor'
+
+    cursor = None
+
+    def get_keys(self, queryset):
+        """
+        Return the ``(path, descending)`` pairs the queryset is ordered by, ending with the primary key, or
+        None when the ordering cannot be sought on.
+        """
+        query = queryset.query
+        ordering = query.order_by or (query.default_ordering and queryset.model._meta.ordering) or []
+        keys = []
+
+        for name in ordering:
+            if not isinstance(name, str) or name == '?':
+                return None
+
+            path, descending = name.lstrip('-'), name.startswith('-')
+
+            if path in ('pk', queryset.model._meta.pk.name):
+                return keys + [('pk', descending)]
+
+            keys.append((path, descending))
+
+        return keys + [('pk', keys[-1][1] if keys else False)]
+
+    def get_field(self, model, path):
+        for name in path.split('__')[:-1]:
+            model = model._meta.get_field(name).related_model
+
+        return model._meta.pk if path.split('__')[-1] == 'pk' else model._meta.get_field(path.split('__')[-1])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keys = self.get_keys(queryset)
+
+        if self.cursor_query_param not in request.query_params or keys is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        fields = [self.get_field(queryset.model, path) for path, _ in keys]
+        position, reverse = self.decode_cursor(request.query_params[self.cursor_query_param], fields)
+        ordering = [('-' if descending else '') + path for path, descending in keys]
+        rows = queryset.order_by(*ordering)
+
+        if position is not None:
+            rows = rows.filter(self.get_seek_filter(keys, position, reverse))
+
+            if reverse:
+                rows = rows.reverse()
+
+        rows = list(rows.values_list(*[path for path, _ in keys])[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+
+        self.cursor = {
+            'next': rows[-1] if rows and (has_more or reverse) else None,
+            'previous': rows[0] if rows and position is not None and (has_more or not reverse) else None
+        }
+
+        if not rows:
+            return []
+
+        return list(queryset.filter(pk__in=[row[-1] for row in rows]).order_by(*ordering))
+
+    @staticmethod
+    def get_seek_filter(keys, position, reverse):
+        """
+        Select the rows after ``position`` in the order of ``keys``, or before it when ``reverse``.
+        """
+        def lookup(descending, strict):
+            return ('lt' if descending != reverse else 'gt') + ('' if strict else 'e')
+
+        (first, first_descending), value = keys[0], position[0]
+
+        # The bound on the first column alone is what lets the scan start at the cursor in the index
+        bound = Q(**{'%s__%s' % (first, lookup(first_descending, False)): value})
+        after = Q(pk__in=[])
+
+        for index, (path, descending) in enumerate(keys):
+            after |= Q(
+                **{earlier: position[earlier_index] for earlier_index, (earlier, _) in enumerate(keys[:index])},
+                **{'%s__%s' % (path, lookup(descending, True)): position[index]}
+            )
+
+        return bound & after
+
+    def decode_cursor(self, value, fields):
+        """
+        Return the ``(position, reverse)`` of a cursor, ``(None, False)`` for an empty one, where
+        ``position`` holds the values of ``fields``.
+        """
+        if not value:
+            return None, False
+
+        try:
+            values, direction = json.loads(urlsafe_b64decode(value.encode()).decode())
+            position = tuple(field.to_python(item) for field, item in zip(fields, values))
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+        if len(position) != len(fields) or direction not in ('n', 'p') or any(
+            item is None or isinstance(item, datetime) and timezone.is_naive(item) for item in position
+        ):
+            raise NotFound('Invalid cursor')
+
+        return position, direction == 'p'
+
+    def encode_cursor(self, position, direction):
+        # Dates, times and decimals are written as strings, which the fields parse back in decode_cursor
+        value = urlsafe_b64encode(json.dumps([position, direction], default=str).encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+
+        return replace_query_param(url, self.cursor_query_param, value)
+
+    def get_paginated_response(self, data):
+        if self.cursor is None:
+            return super().get_paginated_response(data)
+
+        return Response({
+            'pagination': {
+                'links': {
+                    'next': self.encode_cursor(self.cursor['next'], 'n') if self.cursor['next'] else None,
+                    'previous': self.encode_cursor(self.cursor['previous'], 'p') if self.cursor['previous'] else None
+                },
+                'current_page': None,
+                'total': None,
+                'per_page': self.page_size,
+                'last_page': None
+            },
+            'results': data
+        })
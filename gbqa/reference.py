@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from django.core.cache import cache
+from django.db import connection
+from django.utils.cache import get_conditional_response
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from config.models import Fine, Nationality
+from config.serializers import FineSerializer, NationalitySerializer
+from distributors.models import City, DistributorType
+from distributors.serializers import CitySerializer, DistributorTypeSerializer
+from inspections import checklist_cache
+from .renderers import dumps
+from .versions import bump_version, get_version
+
+VERSION_NAMESPACE = 'reference'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+_local = {}
+_lock = threading.Lock()
+
+
+def get_versions():
+    """
+    Return the versions the bundle is built from: the tenant's tables, the shared config tables and the
+    checklists, which keep their own version, see inspections.checklist_cache.
+    """
+    return (
+        get_version(VERSION_NAMESPACE),
+        get_version(VERSION_NAMESPACE, scoped=False),
+        get_version(checklist_cache.VERSION_NAMESPACE)
+    )
+
+
+def build_bundle(context):
+    """
+    Serialize every reference table the way its own list endpoint does.
+    """
+    return {
+        'cities': CitySerializer(City.objects.all(), many=True, context=context).data,
+        'distributorTypes': DistributorTypeSerializer(
+            DistributorType.objects.select_related('photo').order_by('pk', 'name'), many=True, context=context
+        ).data,
+        'nationalities': NationalitySerializer(Nationality.objects.all(), many=True, context=context).data,
+        'fines': FineSerializer(Fine.objects.all(), many=True, context=context).data,
+        'checklists': checklist_cache.get_checklist_data()
+    }
+
+
+def get_bundle(request):
+    """
+    Return the ``(version, data)`` of the reference bundle of the current tenant, where ``version`` is a hash
+    of the content. Photo URLs are absolute, so bundles are kept per host as well.
+    """
+    versions = get_versions()
+    host = request.build_absolute_uri('/')
+    local_key = (connection.schema_name, host)
+
+    with _lock:
+        entry = _local.get(local_key)
+
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+
+    shared_key = 'reference:%s:%s:%s' % (
+        connection.schema_name, hashlib.md5(host.encode()).hexdigest(), ':'.join(map(str, versions))
+    )
+    bundle = cache.get(shared_key)
+
+    if bundle is None:
+        data = build_bundle({'request': request})
+        bundle = (hashlib.md5(dumps(data)).hexdigest(), data)
+        cache.set(shared_key, bundle, CACHE_TIMEOUT)
+
+    with _lock:
+        _local[local_key] = (versions, bundle)
+
+    return bundle
+
+
+def invalidate(**kwargs):
+    bump_version(VERSION_NAMESPACE)
+
+
+def invalidate_shared(**kwargs):
+    bump_version(VERSION_NAMESPACE, scoped=False)
+
+
+class ReferenceBundleAPIView(APIView):
+    """
+    Return the cities, distributor types, nationalities, fines and checklists in one response, with the
+    hash of their content as ``version`` and ETag. Clients can keep the bundle and revalidate it with
+    ``If-None-Match``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        version, data = get_bundle(request)
+        etag = '"%s"' % version
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = Response({
+                'message': 'Success',
+                'version': version,
+                **data
+            }, status=status.HTTP_200_OK)
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+
+        return response
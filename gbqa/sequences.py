@@ -0,0 +1,37 @@
+import threading
+from collections import deque
+from django.db import connection
+
+
+class SequenceAllocator:
+    """
+    Hands out unique values from a Postgres sequence.
+
+    The sequence is created by a migration of a tenant app, so every tenant schema owns its own copy and
+    the name is resolved through the tenant search path. Values are reserved in blocks of ``block_size``
+    and kept per schema, so most calls to ``next`` do not reach the database.
+    """
+
+    def __init__(self, name, block_size=1):
+        self.name = name
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, count):
+        if count <= 0:
+            return []
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s::regclass) FROM generate_series(1, %s)', [self.name, count])
+
+            return [row[0] for row in cursor.fetchall()]
+
+    def next(self):
+        with self._lock:
+            block = self._blocks.setdefault(connection.schema_name, deque())
+
+            if not block:
+                block.extend(self.allocate(self.block_size))
+
+            return block.popleft()
@@ -0,0 +1,158 @@
+import re
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+DISPLAY_SOURCE = re.compile(r'^get_(\w+)_display$')
+
+
+def parse_fieldset(value):
+    """
+    Parse a comma separated list of dotted field paths, e.g. ``id,distributor.name``, into a tree of dicts.
+    """
+    tree = {}
+
+    for path in (value or '').split(','):
+        node = tree
+
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+
+    return tree
+
+
+def apply_fieldset(fields, only=None, expand=None):
+    """
+    Drop the ``fields`` that are not in the ``only`` tree (all are kept when it is None) and render every
+    nested serializer that is not in the ``expand`` tree as primary keys. ``*`` in ``expand`` expands every
+    relation below that level.
+    """
+    expand = expand or {}
+
+    for name in list(fields):
+        if only is not None and name not in only:
+            del fields[name]
+            continue
+
+        field = fields[name]
+        many = isinstance(field, serializers.ListSerializer)
+        nested = field.child if many else field
+
+        if not isinstance(nested, serializers.BaseSerializer):
+            continue
+
+        sub_only = only.get(name) or None if only is not None else None
+
+        if name in expand or sub_only is not None:
+            sub_expand = expand.get(name, {})
+        elif '*' in expand:
+            sub_expand = {'*': {}}
+        else:
+            kwargs = {'source': field.source} if field.source not in (None, name) else {}
+            fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, **kwargs)
+            continue
+
+        apply_fieldset(nested.fields, sub_only, sub_expand)
+
+
+def get_source_fields(serializer, name, field):
+    """
+    Return the model fields that ``field`` reads, or None when they are unknown.
+    """
+    source_fields = getattr(getattr(serializer, 'Meta', None), 'source_fields', {})
+
+    if name in source_fields:
+        return list(source_fields[name])
+
+    if len(field.source_attrs) != 1:
+        return None
+
+    match = DISPLAY_SOURCE.match(field.source_attrs[0])
+
+    return [match.group(1)] if match else [field.source_attrs[0]]
+
+
+def get_queryset_plan(serializer, model):
+    """
+    Walk the fields of ``serializer`` over ``model`` and return the paths to pass to ``select_related``,
+    ``prefetch_related`` and ``only`` so that rendering it runs a fixed number of queries.
+
+    Every column of a model is loaded when one of its fields reads something other than model fields;
+    list those in ``Meta.source_fields`` of the serializer to keep the columns trimmed.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    select, prefetch, only, related = [], [], [], []
+    columns = _all_columns(model)
+    trimmed = True
+
+    for name, field in serializer.fields.items():
+        many = isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField))
+        relation = field.child if isinstance(field, serializers.ListSerializer) else field
+        attrs = get_source_fields(serializer, name, field)
+
+        try:
+            model_field = model._meta.get_field(attrs[0]) if attrs and len(attrs) == 1 else None
+        except FieldDoesNotExist:
+            model_field = None
+
+        if isinstance(relation, serializers.BaseSerializer) and model_field is not None and model_field.is_relation:
+            path = model_field.name
+            sub_select, sub_prefetch, sub_only = get_queryset_plan(relation, model_field.related_model)
+
+            if many:
+                prefetch.append(path)
+                prefetch += ['%s__%s' % (path, lookup) for lookup in sub_select + sub_prefetch]
+                continue
+
+            select.append(path)
+            select += ['%s__%s' % (path, lookup) for lookup in sub_select]
+            prefetch += ['%s__%s' % (path, lookup) for lookup in sub_prefetch]
+            related += [path] + ['%s__%s' % (path, column) for column in sub_only]
+        elif many and model_field is not None:
+            prefetch.append(model_field.name)
+        elif attrs is not None and all(attr in columns for attr in attrs):
+            only += attrs
+        elif model_field is None or not model_field.is_relation:
+            trimmed = False
+
+    return select, prefetch, (only if trimmed else columns) + related
+
+
+def _all_columns(model):
+    return [field.name for field in model._meta.concrete_fields]
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets, read from the ``fields`` and ``expand`` keyword arguments or
+    from the query params of the request in the context.
+
+    ``fields=id,distributor.name`` picks the fields to render and ``expand=distributor,inspector`` the
+    relations to render nested, ``expand=*`` all of them. Relations that are not expanded are rendered as
+    primary keys. Without a request or the keyword arguments every field is rendered as declared.
+    """
+
+    def __init__(self, *args, **kwargs):
+        only = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        request = kwargs.get('context', {}).get('request')
+
+        super().__init__(*args, **kwargs)
+
+        if request is not None:
+            only = request.query_params.get('fields') if only is None else only
+            expand = request.query_params.get('expand', '') if expand is None else expand
+
+        self._fieldset = None if only is None and expand is None else (
+            parse_fieldset(only) if only else None, parse_fieldset(expand)
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if self._fieldset is not None:
+            apply_fieldset(fields, *self._fieldset)
+
+        return fields
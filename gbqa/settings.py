@@ -58,6 +58,7 @@ SHARED_APPS = [
     'users',
     'config',
     'photo',
+    'scheduler',
     
 ]
 
@@ -146,6 +147,13 @@ DATABASE_ROUTERS = (
     'django_tenants.routers.TenantSyncRouter',
 )
 
+# Cache
+# Point CACHE_URL at a shared backend (e.g. pymemcache://host:11211) so version counters are seen by all workers
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -200,6 +208,10 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'gbqa.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'gbqa.pagination.CustomPagination',
     'PAGE_SIZE': 10
 }
@@ -217,6 +229,32 @@ CORS_ORIGIN_WHITELIST = [
     'http://165.22.247.2:82'
 ]
 
+# Scheduler jobs, run by `manage.py run_scheduler`
+SCHEDULER_JOBS = [
+    {
+        'name': 'generate_inspections',
+        'cron': '0 1 * * *',
+        'task': 'inspections.jobs.generate',
+        'jitter': 60,
+    },
+    {
+        'name': 'process_outbox',
+        'cron': '* * * * *',
+        'task': 'inspections.outbox.process_outbox',
+    },
+    {
+        'name': 'reprice_fines',
+        'cron': '*/15 * * * *',
+        'task': 'inspections.maintenance.reprice_fines',
+    },
+    {
+        'name': 'generate_distributor_users',
+        'cron': '*/15 * * * *',
+        'task': 'distributors.jobs.generate_users',
+        'jitter': 30,
+    },
+]
+
 # Email Settings
 #EMAIL_HOST = "smtp.sendgrid.net"
 #EMAIL_HOST_USER = "env('EMAIL_HOST_USER')"
@@ -4,6 +4,8 @@ from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import routers, serializers, viewsets
+from .batch import BatchAPIView
+from .reference import ReferenceBundleAPIView
 
 # Routers provide an easy way of automatically determining the URL conf.
 router = routers.DefaultRouter()
@@ -25,6 +27,10 @@ urlpatterns = [
         path('inspections/', include('inspections.urls')),
         # Config Routes
         path('config/', include('config.urls')),
+        # Batch Routes
+        path('batch', BatchAPIView.as_view(), name='batch'),
+        # Reference Data Routes
+        path('reference', ReferenceBundleAPIView.as_view(), name='reference'),
     ])),
 ]
 
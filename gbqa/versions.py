@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+
+GLOBAL_SCOPE = 'public'
+
+
+def _version_key(namespace, scoped):
+    return 'version:%s:%s' % (connection.schema_name if scoped else GLOBAL_SCOPE, namespace)
+
+
+def get_version(namespace, scoped=True):
+    """
+    Return the current version counter of ``namespace``, kept in the shared cache per tenant schema
+    unless ``scoped`` is false.
+    """
+    return cache.get_or_set(_version_key(namespace, scoped), 1, None)
+
+
+def bump_version(namespace, scoped=True):
+    """
+    Increment the version counter of ``namespace`` once the current transaction commits.
+    """
+    key = _version_key(namespace, scoped)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+    transaction.on_commit(bump)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import transaction
 from .models import (
     Checklist,
     Inspection,
@@ -6,6 +7,7 @@ from .models import (
     InspectionNotification,
     InspectionLog
 )
+from .tombstones import record_deleted_inspections
 
 
 class ChecklistAdmin(admin.ModelAdmin):
@@ -26,6 +28,16 @@ class InspectionAdmin(admin.ModelAdmin):
     search_fields = ['serial_no']
     inlines = (InspectionChecklistInline,)
 
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            record_deleted_inspections(Inspection.objects.filter(pk=obj.pk))
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            record_deleted_inspections(queryset)
+            super().delete_queryset(request, queryset)
+
 
 class InspectionChecklistAdmin(admin.ModelAdmin):
     list_display = ('inspection', 'detail_en', 'created')
@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 
 
 class InspectionsConfig(AppConfig):
     name = 'inspections'
+
+    def ready(self):
+        from distributors.models import Distributor, DistributorType
+        from .checklist_cache import invalidate
+        from .models import Checklist
+        from .tombstones import record_deleted
+
+        post_save.connect(invalidate, sender=Checklist, dispatch_uid='checklist_cache_save')
+        post_delete.connect(invalidate, sender=Checklist, dispatch_uid='checklist_cache_delete')
+        m2m_changed.connect(
+            invalidate, sender=Checklist.distributor_type.through, dispatch_uid='checklist_cache_m2m'
+        )
+        post_delete.connect(invalidate, sender=DistributorType, dispatch_uid='checklist_cache_type_delete')
+
+        pre_delete.connect(record_deleted, sender=Distributor, dispatch_uid='tombstone_distributor_delete')
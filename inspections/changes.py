@@ -0,0 +1,104 @@
+import base64
+from datetime import date, datetime, timedelta
+from django.db.models import Q
+from django.utils import timezone
+from distributors.models import Distributor
+from distributors.serializers import DistributorChangeSerializer
+from .models import Inspection, InspectionChecklist, Tombstone
+from .serializers import InspectionChangeSerializer, InspectionChecklistChangeSerializer
+
+# Rows committed by transactions that were still running when a cursor was issued can carry an older
+# updated time, so every sync reads this far back from the cursor. Clients upsert by id, so repeats are harmless.
+CURSOR_OVERLAP = timedelta(seconds=30)
+
+
+def encode_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Raises ValueError for a cursor that was not issued by ``encode_cursor``.
+    """
+    try:
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (TypeError, UnicodeError, base64.binascii.Error):
+        raise ValueError('Invalid cursor')
+
+    if timezone.is_naive(moment):
+        raise ValueError('Invalid cursor')
+
+    return moment
+
+
+def get_changes(user, since=None, today=None):
+    """
+    Return the inspections, checklist items and distributors of inspector ``user`` that changed after the
+    ``since`` cursor, the ids that were deleted or taken away from them, and the cursor for the next sync.
+
+    Without a cursor everything currently assigned to the user is returned. The items of every inspection
+    in the delta are returned with it. Checklist items are only ever removed together with their inspection.
+    """
+    today = today or date.today()
+    cursor = encode_cursor(timezone.now())
+
+    inspections = Inspection.objects.filter(inspector=user)
+    checklists = InspectionChecklist.objects.filter(inspection__inspector=user)
+    distributors = Distributor.objects.filter(inspector=user)
+    tombstones = Tombstone.objects.filter(user=user)
+
+    if since is not None:
+        since = since - CURSOR_OVERLAP
+
+        # Pending inspections become incomplete at midnight without being written, see get_effective_status
+        inspections = inspections.filter(
+            Q(updated__gt=since) |
+            Q(status=Inspection.STATUS_PENDING, date_initial__gte=since.date(), date_initial__lt=today)
+        )
+        distributors = distributors.filter(updated__gt=since)
+        tombstones = tombstones.filter(created__gt=since)
+    else:
+        inspections = inspections.exclude(status=Inspection.STATUS_DELETED)
+        checklists = checklists.exclude(inspection__status=Inspection.STATUS_DELETED)
+        distributors = distributors.filter(is_active=True)
+        tombstones = tombstones.none()
+
+    inspections = list(inspections.order_by('id'))
+    distributors = list(distributors.order_by('id'))
+
+    if since is not None:
+        # Reassigned inspections keep the updated time of their items, which the new inspector has never seen
+        checklists = checklists.filter(
+            Q(updated__gt=since) | Q(inspection_id__in=[inspection.pk for inspection in inspections])
+        )
+
+    deleted_inspections = {
+        inspection.pk for inspection in inspections if inspection.status == Inspection.STATUS_DELETED
+    }
+    deleted_distributors = {distributor.pk for distributor in distributors if not distributor.is_active}
+
+    for model, object_id in tombstones.values_list('model', 'object_id'):
+        if model == Tombstone.MODEL_INSPECTION:
+            deleted_inspections.add(object_id)
+        else:
+            deleted_distributors.add(object_id)
+
+    # A distributor that was taken away and assigned back again is live
+    deleted_distributors -= {distributor.pk for distributor in distributors if distributor.is_active}
+
+    return {
+        'cursor': cursor,
+        'inspections': InspectionChangeSerializer(
+            [inspection for inspection in inspections if inspection.pk not in deleted_inspections], many=True
+        ).data,
+        'checklists': InspectionChecklistChangeSerializer(
+            checklists.exclude(inspection_id__in=deleted_inspections).order_by('id'), many=True
+        ).data,
+        'distributors': DistributorChangeSerializer(
+            [distributor for distributor in distributors if distributor.pk not in deleted_distributors], many=True
+        ).data,
+        'deleted': {
+            'inspections': sorted(deleted_inspections),
+            'distributors': sorted(deleted_distributors)
+        }
+    }
@@ -0,0 +1,80 @@
+import threading
+from collections import namedtuple
+from django.core.cache import cache
+from django.db import connection
+from gbqa.versions import bump_version, get_version
+from .models import Checklist
+from .serializers import ChecklistSerializer
+
+VERSION_NAMESPACE = 'checklists'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+CompiledChecklist = namedtuple('CompiledChecklist', ['items', 'full_mark'])
+
+EMPTY_CHECKLIST = CompiledChecklist((), 0)
+
+_local = {}
+_lock = threading.Lock()
+
+
+def compile_templates():
+    """
+    Group the (detail_en, detail_ar, weight) rows of every checklist by distributor type id.
+    """
+    items = {}
+    rows = Checklist.distributor_type.through.objects.order_by('checklist_id').values_list(
+        'distributortype_id', 'checklist__detail_en', 'checklist__detail_ar', 'checklist__weight'
+    )
+
+    for distributor_type_id, detail_en, detail_ar, weight in rows:
+        items.setdefault(distributor_type_id, []).append((detail_en, detail_ar, weight))
+
+    return {
+        distributor_type_id: CompiledChecklist(tuple(rows), sum(weight for _, _, weight in rows))
+        for distributor_type_id, rows in items.items()
+    }
+
+
+def serialize_checklists():
+    queryset = Checklist.objects.prefetch_related('distributor_type').order_by('id')
+
+    return [dict(row) for row in ChecklistSerializer(queryset, many=True).data]
+
+
+def _cached(name, build):
+    version = get_version(VERSION_NAMESPACE)
+    local_key = (connection.schema_name, name)
+
+    with _lock:
+        entry = _local.get(local_key)
+
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    shared_key = 'checklists:%s:%s:%s' % (connection.schema_name, name, version)
+    value = cache.get(shared_key)
+
+    if value is None:
+        value = build()
+        cache.set(shared_key, value, CACHE_TIMEOUT)
+
+    with _lock:
+        _local[local_key] = (version, value)
+
+    return value
+
+
+def get_templates():
+    return _cached('templates', compile_templates)
+
+
+def get_template(distributor_type_id):
+    return get_templates().get(distributor_type_id, EMPTY_CHECKLIST)
+
+
+def get_checklist_data():
+    return _cached('data', serialize_checklists)
+
+
+def invalidate(**kwargs):
+    bump_version(VERSION_NAMESPACE)
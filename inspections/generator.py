@@ -0,0 +1,92 @@
+import time
+from django.db import transaction
+from .checklist_cache import EMPTY_CHECKLIST, get_templates
+from .models import Inspection, InspectionChecklist
+
+BATCH_SIZE = 500
+
+
+class GenerationResult:
+    def __init__(self):
+        self.inspections = 0
+        self.checklists = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return self.inspections + self.checklists
+
+    @property
+    def rows_per_second(self):
+        return round(self.rows / self.elapsed) if self.elapsed else 0
+
+    def as_dict(self):
+        return {
+            'inspections': self.inspections,
+            'checklists': self.checklists,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': self.rows_per_second
+        }
+
+
+def generate_inspections(plan, batch_size=BATCH_SIZE):
+    """
+    Create pending inspections with their checklists for ``plan``, an iterable of (distributor, date) pairs.
+
+    Distributors without an inspector and pairs that already have an inspection are skipped. All rows
+    are written with ``bulk_create`` in batches of ``batch_size`` inside a single transaction.
+    """
+    result = GenerationResult()
+    started = time.monotonic()
+    plan = [(distributor, day) for distributor, day in plan if distributor.inspector_id is not None]
+
+    if plan:
+        with transaction.atomic():
+            _generate(plan, batch_size, result)
+
+    result.elapsed = time.monotonic() - started
+
+    return result
+
+
+def _generate(plan, batch_size, result):
+    dates = [day for _, day in plan]
+    existing = set(
+        Inspection.objects.filter(date_initial__range=[min(dates), max(dates)])
+        .values_list('distributor_id', 'date_initial')
+    )
+    plan = [(distributor, day) for distributor, day in plan if (distributor.pk, day) not in existing]
+
+    if not plan:
+        return
+
+    templates = get_templates()
+    serials = Inspection.serial_numbers.allocate(len(plan))
+
+    for offset in range(0, len(plan), batch_size):
+        chunk = plan[offset:offset + batch_size]
+        inspections = []
+
+        for serial, (distributor, day) in zip(serials[offset:offset + batch_size], chunk):
+            inspections.append(Inspection(
+                serial_no=Inspection.format_serial(serial),
+                date_initial=day,
+                distributor_id=distributor.pk,
+                inspector_id=distributor.inspector_id,
+                account_manager_id=distributor.account_manager_id,
+                total_mark=0,
+                total_rating=0,
+                status=Inspection.STATUS_PENDING
+            ))
+
+        Inspection.objects.bulk_create(inspections)
+
+        checklists = [
+            InspectionChecklist(inspection_id=inspection.pk, detail_en=detail_en, detail_ar=detail_ar, weight=weight)
+            for inspection, (distributor, _) in zip(inspections, chunk)
+            for detail_en, detail_ar, weight in templates.get(distributor.distributor_type_id, EMPTY_CHECKLIST).items
+        ]
+        InspectionChecklist.objects.bulk_create(checklists, batch_size=batch_size)
+
+        result.inspections += len(inspections)
+        result.checklists += len(checklists)
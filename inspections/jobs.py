@@ -0,0 +1,5 @@
+from .planner import DEFAULT_HORIZON, generate_horizon
+
+
+def generate(horizon=DEFAULT_HORIZON):
+    return generate_horizon(horizon).as_dict()
@@ -0,0 +1,206 @@
+import hashlib
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from config.fines import get_fine_sql, get_rules
+from distributors.models import Distributor, DistributorType, DistributorWarning, WarningLog
+from .models import Inspection, InspectionNotification
+from .outbox import process_outbox
+
+
+RESCHEDULE_CHUNK_SIZE = 500
+
+RESCHEDULE_SQL = (
+    'UPDATE {table} SET date_initial = %s, status = %s, version = version + 1, updated = %s '
+    'WHERE distributor_id = ANY(%s) AND (status = %s OR status BETWEEN %s AND %s) '
+    'RETURNING id'
+)
+
+REPRICE_SQL = (
+    'WITH priced AS ('
+    'SELECT DISTINCT ON (w.id) w.id, d.name AS distributor_name, {fine} AS amount '
+    'FROM {warnings} w '
+    'JOIN {warning_notifications} wn ON wn.distributorwarning_id = w.id '
+    'JOIN {notifications} n ON n.id = wn.inspectionnotification_id '
+    'JOIN {inspections} i ON i.id = n.inspection_id '
+    'JOIN {distributors} d ON d.id = w.distributor_id '
+    'JOIN {types} t ON t.id = d.distributor_type_id '
+    'WHERE w.type = %s AND w.status = %s ORDER BY w.id, n.id'
+    ') '
+    'UPDATE {warnings} w SET amount = COALESCE(p.amount, w.amount), '
+    'status = CASE WHEN p.amount IS NULL THEN %s ELSE w.status END, version = w.version + 1, updated = %s '
+    'FROM priced p WHERE w.id = p.id AND (p.amount IS NULL OR w.amount <> p.amount) '
+    'RETURNING w.id, p.amount, p.distributor_name'
+)
+
+# Submitted inspections below a threshold that have no generated fine, with the first of their notifications to
+# link it to, whichever role the notification has moved on to
+UNFINED_SQL = (
+    'SELECT * FROM ('
+    'SELECT DISTINCT ON (i.id) i.id AS inspection_id, i.distributor_id, i.account_manager_id, d.name, '
+    'n.id AS notification_id, {fine} AS amount '
+    'FROM {inspections} i '
+    'JOIN {notifications} n ON n.inspection_id = i.id '
+    'JOIN {distributors} d ON d.id = i.distributor_id '
+    'JOIN {types} t ON t.id = d.distributor_type_id '
+    'WHERE i.status BETWEEN %s AND %s AND NOT EXISTS ('
+    'SELECT 1 FROM {notifications} fn '
+    'JOIN {warning_notifications} wn ON wn.inspectionnotification_id = fn.id '
+    'JOIN {warnings} w ON w.id = wn.distributorwarning_id '
+    'WHERE fn.inspection_id = i.id AND w.type = %s'
+    ') ORDER BY i.id, n.id'
+    ') unfined WHERE amount IS NOT NULL'
+)
+
+APPLIED_RULES_KEY = 'fines:applied:%s'
+
+
+def reschedule_inspections(distributor_ids, day, chunk_size=RESCHEDULE_CHUNK_SIZE):
+    """
+    Move the open inspections of ``distributor_ids`` to ``day`` and return the ids of the moved rows.
+
+    The ids are updated in chunks of ``chunk_size`` distributors, each as its own UPDATE ... RETURNING
+    statement, so large regions never hold one long lock over the whole table.
+    """
+    sql = RESCHEDULE_SQL.format(table=connection.ops.quote_name(Inspection._meta.db_table))
+    now = timezone.now()
+    ids = []
+
+    for offset in range(0, len(distributor_ids), chunk_size):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                day,
+                Inspection.STATUS_PENDING,
+                now,
+                distributor_ids[offset:offset + chunk_size],
+                Inspection.STATUS_PENDING,
+                Inspection.STATUS_INCOMPLETE,
+                Inspection.STATUS_INCOMPLETE_NOTIFIED
+            ])
+            ids.extend(row[0] for row in cursor.fetchall())
+
+    return ids
+
+
+def get_rules_fingerprint(rules):
+    return hashlib.md5(repr(sorted(rules.items(), key=lambda item: item[0] or '')).encode()).hexdigest()
+
+
+def reprice_fines(force=False):
+    """
+    Re-evaluate the fines of the tenant when the fine rules changed since the last run, or with ``force``.
+
+    Every pending generated fine is repriced in one UPDATE statement, and fines whose inspection is no
+    longer below any threshold are rejected. Submitted inspections that are now below a threshold and never
+    had a generated fine are fined. Fines that were already approved or rejected, and forced fines, are
+    left alone.
+    """
+    rules = get_rules()
+    fingerprint = get_rules_fingerprint(rules)
+    key = APPLIED_RULES_KEY % connection.schema_name
+
+    if not force and cache.get(key) == fingerprint:
+        return {'repriced': 0, 'withdrawn': 0, 'fined': 0}
+
+    # Submissions still waiting in the outbox were priced with the rules they were submitted under
+    process_outbox()
+
+    with transaction.atomic():
+        result = _reprice_pending(rules)
+        result['fined'] = _fine_unfined(rules)
+
+        transaction.on_commit(lambda: cache.set(key, fingerprint, None))
+
+    return result
+
+
+def _tables():
+    quote = connection.ops.quote_name
+
+    return {
+        'warnings': quote(DistributorWarning._meta.db_table),
+        'warning_notifications': quote(DistributorWarning.notifications.through._meta.db_table),
+        'notifications': quote(InspectionNotification._meta.db_table),
+        'inspections': quote(Inspection._meta.db_table),
+        'distributors': quote(Distributor._meta.db_table),
+        'types': quote(DistributorType._meta.db_table)
+    }
+
+
+def _reprice_pending(rules):
+    fine, fine_params = get_fine_sql('t.name', 'i.total_mark', rules)
+    sql = REPRICE_SQL.format(fine=fine, **_tables())
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, fine_params + [
+            DistributorWarning.TYPE_GENERATED,
+            DistributorWarning.STATUS_PENDING,
+            DistributorWarning.STATUS_REJECTED,
+            timezone.now()
+        ])
+        changed = cursor.fetchall()
+
+    # Store Warning Log
+    WarningLog.objects.bulk_create([
+        WarningLog(
+            distributor_warning_id=pk,
+            title=(
+                distributor_name + ' fine has been changed to SR ' + str(amount) if amount is not None
+                else distributor_name + ' fine has been withdrawn'
+            ),
+            subtitle='Fine rules changed',
+            generated_by=WarningLog.GEN_BY_SYSTEM,
+            type=WarningLog.TYPE_INFO
+        )
+        for pk, amount, distributor_name in changed
+    ])
+
+    return {
+        'repriced': sum(1 for _, amount, _ in changed if amount is not None),
+        'withdrawn': sum(1 for _, amount, _ in changed if amount is None)
+    }
+
+
+def _fine_unfined(rules):
+    fine, fine_params = get_fine_sql('t.name', 'i.total_mark', rules)
+    low, high = Inspection.STATUS_BUCKETS['complete']
+
+    with connection.cursor() as cursor:
+        cursor.execute(UNFINED_SQL.format(fine=fine, **_tables()), fine_params + [
+            low, high, DistributorWarning.TYPE_GENERATED
+        ])
+        rows = cursor.fetchall()
+
+    warnings = [
+        DistributorWarning(
+            distributor_id=distributor_id,
+            amount=amount,
+            account_manager_id=account_manager_id,
+            type=DistributorWarning.TYPE_GENERATED,
+            status=DistributorWarning.STATUS_PENDING
+        )
+        for _, distributor_id, account_manager_id, _, _, amount in rows
+    ]
+    DistributorWarning.objects.bulk_create(warnings)
+
+    # Store Warning Log
+    WarningLog.objects.bulk_create([
+        WarningLog(
+            distributor_warning=warning,
+            title=distributor_name + ' has been fined SR ' + str(warning.amount),
+            subtitle='Fine rules changed',
+            generated_by=WarningLog.GEN_BY_SYSTEM,
+            type=WarningLog.TYPE_INFO
+        )
+        for warning, (_, _, _, distributor_name, _, _) in zip(warnings, rows)
+    ])
+
+    DistributorWarning.notifications.through.objects.bulk_create([
+        DistributorWarning.notifications.through(
+            distributorwarning_id=warning.pk,
+            inspectionnotification_id=notification_id
+        )
+        for warning, (_, _, _, _, notification_id, _) in zip(warnings, rows)
+    ])
+
+    return len(warnings)
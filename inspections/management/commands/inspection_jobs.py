@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from clients.runner import get_tenant_schemas, run_for_tenants
+from inspections.jobs import generate
+from inspections.planner import DEFAULT_HORIZON
+
+
+class Command(BaseCommand):
+    help = 'Generate inspections for every tenant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help='Number of days to generate')
+        parser.add_argument('--schema', action='append', dest='schemas', help='Only run for this tenant schema')
+
+    def handle(self, *args, **options):
+        if options['horizon'] < 1:
+            raise CommandError('Horizon must be at least one day')
+
+        schema_names = get_tenant_schemas(options['schemas'])
+        failed = 0
+        total = {}
+
+        runs = run_for_tenants(generate, schema_names, options['horizon'], workers=options['workers'])
+
+        for run in runs:
+            if run.error is not None:
+                failed += 1
+                self.stderr.write(self.style.ERROR('%s failed after %.2fs' % (run.schema_name, run.elapsed)))
+                self.stderr.write(run.error)
+
+                continue
+
+            for key in ('inspections', 'checklists', 'elapsed'):
+                total[key] = total.get(key, 0) + run.result[key]
+
+            self.stdout.write('%s: %s in %.2fs' % (run.schema_name, self.format_counts(run.result), run.elapsed))
+
+        if total:
+            # A rate over all tenants, from the time spent writing in each of them
+            rows = total['inspections'] + total['checklists']
+            total['rows_per_second'] = round(rows / total['elapsed']) if total['elapsed'] else 0
+            total['elapsed'] = round(total['elapsed'], 3)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Processed %d tenants (%d failed): %s' % (len(schema_names), failed, self.format_counts(total))
+        ))
+
+    @staticmethod
+    def format_counts(counts):
+        return ', '.join('%s=%s' % (key, value) for key, value in sorted(counts.items())) or 'nothing to do'
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from clients.runner import get_tenant_schemas, run_for_tenants
+from inspections.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the distributor rating statistics of every tenant from its submitted inspections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--schema', action='append', dest='schemas', help='Only run for this tenant schema')
+
+    def handle(self, *args, **options):
+        schema_names = get_tenant_schemas(options['schemas'])
+        failed = 0
+
+        for run in run_for_tenants(rebuild_stats, schema_names, workers=options['workers']):
+            if run.error is not None:
+                failed += 1
+                self.stderr.write(self.style.ERROR('%s failed after %.2fs' % (run.schema_name, run.elapsed)))
+                self.stderr.write(run.error)
+
+                continue
+
+            self.stdout.write('%s: stats=%d in %.2fs' % (run.schema_name, run.result['stats'], run.elapsed))
+
+        self.stdout.write(self.style.SUCCESS('Processed %d tenants (%d failed)' % (len(schema_names), failed)))
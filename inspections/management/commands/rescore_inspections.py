@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from clients.runner import get_tenant_schemas, run_for_tenants
+from inspections.rescoring import CHUNK_SIZE, rescore
+
+
+class Command(BaseCommand):
+    help = 'Recompute the totals of submitted inspections and distributors from their checklist items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--schema', action='append', dest='schemas', help='Only run for this tenant schema')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Inspections scored per chunk')
+        parser.add_argument(
+            '--sync-weights', action='store_true', help='Copy the current checklist weights onto past inspections'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Chunk size must be at least one')
+
+        schema_names = get_tenant_schemas(options['schemas'])
+        failed = 0
+
+        runs = run_for_tenants(
+            rescore, schema_names, options['chunk_size'], options['sync_weights'], workers=options['workers']
+        )
+
+        for run in runs:
+            if run.error is not None:
+                failed += 1
+                self.stderr.write(self.style.ERROR('%s failed after %.2fs' % (run.schema_name, run.elapsed)))
+                self.stderr.write(run.error)
+
+                continue
+
+            self.stdout.write('%s: %s in %.2fs' % (
+                run.schema_name,
+                ', '.join('%s=%d' % (key, value) for key, value in sorted(run.result.items())),
+                run.elapsed
+            ))
+
+        self.stdout.write(self.style.SUCCESS('Processed %d tenants (%d failed)' % (len(schema_names), failed)))
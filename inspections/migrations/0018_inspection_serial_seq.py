@@ -0,0 +1,21 @@
+# Generated by Django 3.2.10 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0017_delete_warningnotification'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE SEQUENCE IF NOT EXISTS inspections_inspection_serial_seq",
+                "SELECT setval('inspections_inspection_serial_seq', "
+                "COALESCE((SELECT MAX(id) FROM inspections_inspection), 0) + 1, false)",
+            ],
+            reverse_sql="DROP SEQUENCE IF EXISTS inspections_inspection_serial_seq",
+        ),
+    ]
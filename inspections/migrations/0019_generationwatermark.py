@@ -0,0 +1,24 @@
+# Generated by Django 3.2.10 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0018_inspection_serial_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=48, unique=True)),
+                ('date_until', models.DateField(null=True)),
+                ('last_run', models.DateTimeField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
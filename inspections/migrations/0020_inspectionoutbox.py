@@ -0,0 +1,33 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inspections', '0019_generationwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InspectionOutbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('submitted', 'Submitted')], max_length=12)),
+                ('payload', models.JSONField(default=dict)),
+                ('processed', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('inspection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to='inspections.inspection')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_user', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='inspectionoutbox',
+            index=models.Index(fields=['processed', 'id'], name='inspections_process_0dab3d_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distributors', '0013_distributor_inspector_updated'),
+        ('inspections', '0021_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistributorStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('rating_sq_sum', models.FloatField(default=0)),
+                ('mark_sum', models.BigIntegerField(default=0)),
+                ('mark_sq_sum', models.BigIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('distributor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='distributors.distributor')),
+            ],
+            options={
+                'unique_together': {('distributor', 'period', 'period_start')},
+            },
+        ),
+    ]
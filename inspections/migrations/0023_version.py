@@ -0,0 +1,23 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0022_distributorstat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspection',
+            name='version',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='inspectionnotification',
+            name='version',
+            field=models.IntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0023_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['updated', 'id'], name='inspections_updated_bbd212_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionlog',
+            index=models.Index(fields=['updated', 'id'], name='inspections_updated_138303_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionnotification',
+            index=models.Index(fields=['updated', 'id'], name='inspections_updated_fb09b1_idx'),
+        ),
+    ]
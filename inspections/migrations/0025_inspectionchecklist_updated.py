@@ -0,0 +1,22 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0024_updated_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checklist',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionchecklist',
+            index=models.Index(fields=['inspection', 'updated'], name='inspections_inspect_a1206b_idx'),
+        ),
+    ]
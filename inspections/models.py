@@ -2,6 +2,7 @@ from django.db import models
 from datetime import date
 from auth.models import User
 from photo.models import Photo
+from gbqa.sequences import SequenceAllocator
 from distributors.models import (
     DistributorType,
     Distributor,
@@ -21,6 +22,31 @@ class Checklist(models.Model):
         return self.detail_en
 
 
+class InspectionQuerySet(models.QuerySet):
+    def with_effective_status(self, today=None):
+        """
+        Annotate ``effective_status``, which reports pending inspections from before ``today`` as incomplete.
+        """
+        return self.annotate(effective_status=models.Case(
+            models.When(
+                status=Inspection.STATUS_PENDING,
+                date_initial__lt=today or date.today(),
+                then=models.Value(Inspection.STATUS_INCOMPLETE)
+            ),
+            default=models.F('status'),
+            output_field=models.IntegerField()
+        ))
+
+    def filter_status_buckets(self, buckets, today=None):
+        status_q = models.Q()
+
+        for bucket in buckets:
+            if bucket in Inspection.STATUS_BUCKETS:
+                status_q |= models.Q(effective_status__range=Inspection.STATUS_BUCKETS[bucket])
+
+        return self.with_effective_status(today).filter(status_q)
+
+
 class Inspection(models.Model):
     # STATUS CHOICES
     STATUS_PENDING = 100
@@ -43,6 +69,16 @@ class Inspection(models.Model):
         (STATUS_DELETED, 'Deleted')
     ]
 
+    # STATUS BUCKETS (inclusive ranges used by the list filters)
+    STATUS_BUCKETS = {
+        'pending': (STATUS_PENDING, STATUS_PENDING),
+        'incomplete': (STATUS_INCOMPLETE, STATUS_INCOMPLETE_NOTIFIED),
+        'complete': (STATUS_COMPLETED, STATUS_SUPERVISOR_DECLINED),
+    }
+
+    # Statuses an inspector can still submit or a supervisor can still reassign
+    OPEN_STATUSES = [STATUS_PENDING, STATUS_INCOMPLETE, STATUS_INCOMPLETE_NOTIFIED, STATUS_INCOMPLETE_REASSIGNED]
+
     # DATABASE FIELDS
     serial_no = models.CharField(max_length=24)
     date_initial = models.DateField(default=date.today, null=False)
@@ -63,14 +99,43 @@ class Inspection(models.Model):
     finance_record_no = models.CharField(max_length=16, blank=True, null=True)
     finance_is_read = models.BooleanField(default=False)
     status = models.IntegerField(choices=STATUS_CHOICES, null=True)
+    version = models.IntegerField(default=1)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    objects = InspectionQuerySet.as_manager()
+
+    serial_numbers = SequenceAllocator('inspections_inspection_serial_seq')
+
     def __str__(self):
         return self.serial_no
 
+    def get_effective_status(self, today=None):
+        if self.status == self.STATUS_PENDING and self.date_initial < (today or date.today()):
+            return self.STATUS_INCOMPLETE
+
+        return self.status
+
+    def get_effective_status_display(self):
+        return dict(self.STATUS_CHOICES).get(self.get_effective_status())
+
+    @staticmethod
+    def format_serial(value):
+        return 'SN ' + str(value).zfill(6)
+
+    @staticmethod
+    def round_mark(value):
+        """
+        Truncate a percentage to a whole mark, as the integer column always stored it: 79.9 is a 79.
+        """
+        return int(value)
+
     class Meta:
         ordering = ['-updated']
+        indexes = [
+            models.Index(fields=['inspector', 'updated']),
+            models.Index(fields=['updated', 'id']),
+        ]
 
 
 class InspectionChecklist(models.Model):
@@ -95,6 +160,11 @@ class InspectionChecklist(models.Model):
     def __str__(self):
         return self.detail_en
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['inspection', 'updated']),
+        ]
+
 
 class InspectionNotification(models.Model):
     # DATABASE FIELDS
@@ -103,12 +173,18 @@ class InspectionNotification(models.Model):
     is_read = models.BooleanField(default=False)
     role = models.CharField(max_length=48, default=None, blank=True, null=True)
     generated_by = models.ForeignKey(User, related_name='in_gen_by', on_delete=models.SET_NULL, blank=True, null=True)
+    version = models.IntegerField(default=1)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated', 'id']),
+        ]
+
 
 class InspectionLog(models.Model):
     # LOG TYPE CHOICES
@@ -147,3 +223,100 @@ class InspectionLog(models.Model):
 
     def __str__(self):
         return self.title
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated', 'id']),
+        ]
+
+
+class GenerationWatermark(models.Model):
+    # DATABASE FIELDS
+    name = models.CharField(max_length=48, unique=True)
+    date_until = models.DateField(null=True)
+    last_run = models.DateTimeField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class InspectionOutbox(models.Model):
+    # EVENT TYPE CHOICES
+    TYPE_SUBMITTED = 'submitted'
+
+    TYPE_CHOICES = [
+        (TYPE_SUBMITTED, 'Submitted'),
+    ]
+
+    # DATABASE FIELDS
+    inspection = models.ForeignKey(Inspection, related_name='outbox', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='outbox_user', on_delete=models.SET_NULL, blank=True, null=True)
+    type = models.CharField(max_length=12, choices=TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    processed = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '%s %s' % (self.inspection_id, self.type)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed', 'id']),
+        ]
+
+
+class Tombstone(models.Model):
+    # MODEL CHOICES
+    MODEL_INSPECTION = 'inspection'
+    MODEL_DISTRIBUTOR = 'distributor'
+
+    MODEL_CHOICES = [
+        (MODEL_INSPECTION, 'Inspection'),
+        (MODEL_DISTRIBUTOR, 'Distributor'),
+    ]
+
+    # DATABASE FIELDS
+    model = models.CharField(max_length=12, choices=MODEL_CHOICES)
+    object_id = models.IntegerField()
+    user = models.ForeignKey(User, related_name='tombstone_user', on_delete=models.CASCADE, blank=True, null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return '%s %s' % (self.model, self.object_id)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created']),
+        ]
+
+
+class DistributorStat(models.Model):
+    # PERIOD CHOICES
+    PERIOD_DAY = 'day'
+    PERIOD_MONTH = 'month'
+
+    PERIOD_CHOICES = [
+        (PERIOD_DAY, 'Day'),
+        (PERIOD_MONTH, 'Month'),
+    ]
+
+    # DATABASE FIELDS
+    distributor = models.ForeignKey(Distributor, related_name='stats', on_delete=models.CASCADE)
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    count = models.IntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
+    rating_sq_sum = models.FloatField(default=0)
+    mark_sum = models.BigIntegerField(default=0)
+    mark_sq_sum = models.BigIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '%s %s %s' % (self.distributor_id, self.period, self.period_start)
+
+    class Meta:
+        unique_together = ['distributor', 'period', 'period_start']
@@ -0,0 +1,143 @@
+from django.db import transaction
+from django.utils import timezone
+from config.fines import get_fine, get_rules
+from distributors.models import Distributor, DistributorWarning, WarningLog
+from .models import InspectionLog, InspectionNotification, InspectionOutbox
+from .stats import fold_distributor_ratings
+
+BATCH_SIZE = 200
+
+
+def record_submission(inspection, user):
+    """
+    Queue the side effects of a submitted inspection. Call inside the submission transaction.
+    """
+    return record_submissions([inspection], user)[0]
+
+
+def record_submissions(inspections, user):
+    rules = get_rules()
+    distributor_types = dict(
+        Distributor.objects.filter(pk__in={inspection.distributor_id for inspection in inspections}).values_list(
+            'pk', 'distributor_type__name'
+        )
+    )
+
+    return InspectionOutbox.objects.bulk_create([
+        InspectionOutbox(
+            inspection=inspection,
+            user=user,
+            type=InspectionOutbox.TYPE_SUBMITTED,
+            payload={
+                'total_mark': int(inspection.total_mark),
+                'total_rating': float(inspection.total_rating),
+                'fine': get_fine(distributor_types.get(inspection.distributor_id), int(inspection.total_mark), rules)
+            }
+        )
+        for inspection in inspections
+    ])
+
+
+def process_outbox(batch_size=BATCH_SIZE):
+    """
+    Turn unprocessed outbox rows into notifications, logs and warnings and return how many were handled.
+
+    Rows are claimed with SKIP LOCKED, so several workers can drain the outbox side by side.
+    """
+    total = 0
+
+    while True:
+        with transaction.atomic():
+            events = list(
+                InspectionOutbox.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(processed__isnull=True)
+                .select_related('inspection__distributor')
+                .order_by('id')[:batch_size]
+            )
+
+            if not events:
+                break
+
+            _process_submissions([event for event in events if event.type == InspectionOutbox.TYPE_SUBMITTED])
+            InspectionOutbox.objects.filter(pk__in=[event.pk for event in events]).update(processed=timezone.now())
+
+        total += len(events)
+
+        if len(events) < batch_size:
+            break
+
+    return total
+
+
+def _process_submissions(events):
+    notifications = []
+    logs = []
+    fined = []
+
+    for event in events:
+        inspection = event.inspection
+        title = inspection.distributor.name + ' visit score is ' + str(event.payload['total_mark']) + '%'
+
+        # Store Inspection Notification
+        notifications.append(InspectionNotification(
+            inspection=inspection,
+            title=title,
+            role='supervisor',
+            generated_by_id=event.user_id
+        ))
+
+        # Store Inspection Log
+        logs.append(InspectionLog(
+            inspection=inspection,
+            title=title,
+            subtitle='',
+            generated_by=InspectionLog.GEN_BY_SYSTEM,
+            user_id=event.user_id,
+            type=InspectionLog.TYPE_INFO
+        ))
+
+        if event.payload.get('fine') is not None:
+            fined.append((event, notifications[-1]))
+
+    # Rows queued before the rating was part of the payload already updated their distributor
+    fold_distributor_ratings([
+        (event.inspection.distributor_id, event.payload['total_rating'])
+        for event in events
+        if 'total_rating' in event.payload
+    ])
+
+    InspectionNotification.objects.bulk_create(notifications)
+    InspectionLog.objects.bulk_create(logs)
+
+    warnings = [
+        DistributorWarning(
+            distributor=event.inspection.distributor,
+            amount=event.payload['fine'],
+            account_manager_id=event.inspection.account_manager_id,
+            type=DistributorWarning.TYPE_GENERATED,
+            status=DistributorWarning.STATUS_PENDING
+        )
+        for event, _ in fined
+    ]
+    DistributorWarning.objects.bulk_create(warnings)
+
+    # Store Warning Log
+    WarningLog.objects.bulk_create([
+        WarningLog(
+            distributor_warning=warning,
+            title=warning.distributor.name + ' has been fined SR ' + str(warning.amount),
+            subtitle='',
+            generated_by=WarningLog.GEN_BY_SYSTEM,
+            user_id=event.user_id,
+            type=WarningLog.TYPE_INFO
+        )
+        for warning, (event, _) in zip(warnings, fined)
+    ])
+
+    DistributorWarning.notifications.through.objects.bulk_create([
+        DistributorWarning.notifications.through(
+            distributorwarning_id=warning.pk,
+            inspectionnotification_id=notification.pk
+        )
+        for warning, (_, notification) in zip(warnings, fined)
+    ])
@@ -0,0 +1,78 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from django.db import transaction
+from django.utils import timezone
+from distributors.models import Distributor
+from .generator import generate_inspections
+from .models import GenerationWatermark
+
+DEFAULT_HORIZON = 1
+WATERMARK_NAME = 'inspections'
+
+
+def is_visit_day(distributor, day):
+    """
+    Weekly distributors are visited on the weekday they were created, monthly ones on the same day of
+    the month (or the last day of shorter months). Anything else is visited daily.
+    """
+    anchor = distributor.created.date()
+
+    if distributor.visit_frequency == Distributor.FREQUENCY_WEEKLY:
+        return day.weekday() == anchor.weekday()
+
+    if distributor.visit_frequency == Distributor.FREQUENCY_MONTHLY:
+        return day.day == min(anchor.day, monthrange(day.year, day.month)[1])
+
+    return True
+
+
+def plan_inspections(distributors, start, until):
+    days = [start + timedelta(days=offset) for offset in range((until - start).days + 1)]
+
+    return [
+        (distributor, day)
+        for distributor in distributors
+        for day in days
+        if is_visit_day(distributor, day)
+    ]
+
+
+def get_distributors():
+    return Distributor.objects.filter(inspector__isnull=False).only(
+        'id', 'distributor_type_id', 'inspector_id', 'account_manager_id', 'visit_frequency', 'created'
+    )
+
+
+def generate_horizon(horizon=DEFAULT_HORIZON, today=None):
+    """
+    Generate inspections for the ``horizon`` days starting ``today``.
+
+    A per-tenant watermark remembers the last generated day and when the previous run started. A re-run
+    only plans the days after the watermark for every distributor, plus the already covered days for
+    distributors that were added or changed since the previous run.
+    """
+    today = today or date.today()
+    until = today + timedelta(days=horizon - 1)
+    run_started = timezone.now()
+
+    with transaction.atomic():
+        watermark, _ = GenerationWatermark.objects.select_for_update().get_or_create(name=WATERMARK_NAME)
+        distributors = get_distributors()
+
+        if watermark.date_until is None or watermark.last_run is None:
+            plan = plan_inspections(distributors, today, until)
+        else:
+            covered_until = min(watermark.date_until, until)
+            plan = plan_inspections(distributors, max(today, watermark.date_until + timedelta(days=1)), until)
+
+            if covered_until >= today:
+                changed = distributors.filter(updated__gte=watermark.last_run)
+                plan += plan_inspections(changed, today, covered_until)
+
+        result = generate_inspections(plan)
+
+        watermark.date_until = max(until, watermark.date_until) if watermark.date_until else until
+        watermark.last_run = run_started
+        watermark.save()
+
+    return result
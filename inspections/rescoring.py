@@ -0,0 +1,160 @@
+import io
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from distributors.models import Distributor
+from .models import Checklist, Inspection, InspectionChecklist
+from .outbox import process_outbox
+from .stats import rebuild_stats
+
+CHUNK_SIZE = 20000
+
+SYNC_WEIGHTS_SQL = (
+    'UPDATE {checklists} ic SET weight = c.weight, updated = %s '
+    'FROM {inspections} i, {distributors} d, {templates_types} ct, {templates} c '
+    'WHERE ic.inspection_id = i.id AND i.distributor_id = d.id AND ct.distributortype_id = d.distributor_type_id '
+    'AND c.id = ct.checklist_id AND c.detail_en = ic.detail_en AND ic.weight <> c.weight'
+)
+
+# Every column is a non-null int4, so each row of the binary COPY has the fixed layout of ROW_DTYPE
+ROWS_SQL = (
+    'COPY (SELECT ic.inspection_id, ic.weight, COALESCE(ic.response, false)::integer, '
+    '(ic.response IS NOT NULL)::integer '
+    'FROM {checklists} ic JOIN {inspections} i ON i.id = ic.inspection_id '
+    'WHERE ic.inspection_id >= %s AND ic.inspection_id < %s AND i.status BETWEEN %s AND %s) '
+    'TO STDOUT WITH (FORMAT binary)'
+)
+
+COLUMNS = ('inspection_id', 'weight', 'response', 'submitted')
+
+# Field count, then the length and value of every column, in network byte order
+ROW_DTYPE = np.dtype([('count', '>i2')] + [
+    item for name in COLUMNS for item in [(name + '_length', '>i4'), (name, '>i4')]
+])
+
+# Signature, flags and header extension length before the rows, and the -1 field count after them
+COPY_HEADER_SIZE = 19
+COPY_TRAILER_SIZE = 2
+
+UPDATE_INSPECTIONS_SQL = (
+    'UPDATE {inspections} i SET total_mark = v.mark, total_rating = v.rating, version = i.version + 1, updated = %s '
+    'FROM unnest(%s::integer[], %s::integer[], %s::numeric[]) AS v(id, mark, rating) '
+    'WHERE i.id = v.id AND (i.total_mark <> v.mark OR i.total_rating <> v.rating)'
+)
+
+# Visits are counted from the inspections themselves, as inspections without checklist items count as well
+UPDATE_DISTRIBUTORS_SQL = (
+    'UPDATE {distributors} d SET total_visits = COALESCE(v.visits, 0), ratings = COALESCE(v.rating, 0), '
+    'updated = %s '
+    'FROM {distributors} dd LEFT JOIN ('
+    'SELECT distributor_id, COUNT(*) AS visits, ROUND(AVG(total_rating), 1) AS rating FROM {inspections} '
+    'WHERE status BETWEEN %s AND %s GROUP BY distributor_id'
+    ') v ON v.distributor_id = dd.id '
+    'WHERE d.id = dd.id AND (d.total_visits <> COALESCE(v.visits, 0) OR d.ratings <> COALESCE(v.rating, 0))'
+)
+
+
+def _tables():
+    quote = connection.ops.quote_name
+
+    return {
+        'checklists': quote(InspectionChecklist._meta.db_table),
+        'inspections': quote(Inspection._meta.db_table),
+        'distributors': quote(Distributor._meta.db_table),
+        'templates': quote(Checklist._meta.db_table),
+        'templates_types': quote(Checklist.distributor_type.through._meta.db_table)
+    }
+
+
+def sync_weights():
+    """
+    Copy the current checklist template weights onto the checklist items of every inspection, matched by
+    distributor type and English text. Returns the number of items changed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SYNC_WEIGHTS_SQL.format(**_tables()), [timezone.now()])
+
+        return cursor.rowcount
+
+
+def read_chunk(cursor, params):
+    """
+    Read the checklist rows of one chunk with a binary COPY straight into an array of ROW_DTYPE, without
+    building a Python object per row.
+    """
+    buffer = io.BytesIO()
+    cursor.copy_expert(cursor.mogrify(ROWS_SQL.format(**_tables()), params).decode(), buffer)
+    content = buffer.getbuffer()
+
+    return np.frombuffer(content[COPY_HEADER_SIZE:len(content) - COPY_TRAILER_SIZE], dtype=ROW_DTYPE)
+
+
+def score_chunk(rows):
+    """
+    Score the (inspection_id, weight, response, submitted) rows of one chunk with grouped reductions.
+    Returns the inspection ids, marks and ratings as arrays.
+    """
+    ids, inverse = np.unique(rows['inspection_id'], return_inverse=True)
+    submitted = rows['submitted'].astype(np.float64)
+    weights = rows['weight'] * submitted
+    responses = rows['response'] * submitted
+
+    full = np.bincount(inverse, weights=weights)
+    marked = np.bincount(inverse, weights=weights * responses)
+    answered = np.bincount(inverse, weights=responses)
+    items = np.bincount(inverse, weights=submitted)
+
+    # Same rounding as InspectionUpdateSerializer.apply_checklists, over the items that were submitted,
+    # which are the ones with a response: marks are truncated as int() does
+    scored = full > 0
+    marks = np.where(scored, np.floor(marked / np.where(scored, full, 1) * 100), 0).astype(np.int64)
+    ratings = np.where(scored, np.round(answered / np.where(scored, items, 1) * 10, 2), 0)
+
+    return ids, marks, ratings
+
+
+def rescore(chunk_size=CHUNK_SIZE, weights=False):
+    """
+    Recompute the totals of every submitted inspection from its checklist items, then the lifetime totals of
+    every distributor and the rating statistics.
+
+    Checklist items are read in chunks of ``chunk_size`` inspections and scored with NumPy, and only the rows
+    whose totals changed are written, with one UPDATE ... FROM unnest() statement per chunk. Each chunk is
+    committed on its own, so a rescore never holds the locks of the whole table. With ``weights`` the current
+    template weights are copied onto the items first.
+    """
+    tables = _tables()
+    low, high = Inspection.STATUS_BUCKETS['complete']
+    result = {'weights': 0, 'inspections': 0, 'distributors': 0}
+
+    # Submissions still waiting in the outbox would otherwise be folded into the distributors twice
+    process_outbox()
+
+    if weights:
+        result['weights'] = sync_weights()
+
+    bounds = Inspection.objects.filter(status__range=(low, high)).aggregate(first=Min('id'), last=Max('id'))
+    now = timezone.now()
+
+    with connection.cursor() as cursor:
+        for start in range(bounds['first'] or 0, (bounds['last'] or -1) + 1, chunk_size):
+            rows = read_chunk(cursor, [start, start + chunk_size, low, high])
+
+            if not len(rows):
+                continue
+
+            ids, marks, ratings = score_chunk(rows)
+
+            cursor.execute(UPDATE_INSPECTIONS_SQL.format(**tables), [
+                now, ids.tolist(), marks.tolist(), ratings.tolist()
+            ])
+            result['inspections'] += cursor.rowcount
+
+        cursor.execute(UPDATE_DISTRIBUTORS_SQL.format(**tables), [now, low, high])
+        result['distributors'] = cursor.rowcount
+
+    with transaction.atomic():
+        result.update(rebuild_stats())
+
+    return result
@@ -1,5 +1,8 @@
-from django.db.models import F
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from gbqa.concurrency import transition
+from gbqa.serializers import DynamicFieldsMixin
 from .models import (
     Checklist,
     Inspection,
@@ -7,8 +10,8 @@ from .models import (
     InspectionNotification,
     InspectionLog
 )
+from .stats import record_ratings
 from users.serializers import UserGenericSerializer
-from distributors.models import Distributor
 from distributors.serializers import (
     DistributorDetailSerializer,
     DistributorGenericSerializer
@@ -28,7 +31,14 @@ class InspectionChecklistSerializer(serializers.ModelSerializer):
         depth = 2
 
 
+class InspectionChecklistChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InspectionChecklist
+        fields = ['id', 'inspection', 'detail_en', 'detail_ar', 'weight', 'response', 'note', 'attachment', 'updated']
+
+
 class InspectionChecklistUpdateSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
     response = serializers.BooleanField(required=True)
     note = serializers.CharField(max_length=256, allow_null=True)
 
@@ -46,9 +56,24 @@ class InspectionChecklistUpdateSerializer(serializers.ModelSerializer):
         return data
 
 
+class InspectionChecklistSyncSerializer(InspectionChecklistUpdateSerializer):
+    attachment_file = serializers.CharField(required=False, write_only=True)
+
+    class Meta(InspectionChecklistUpdateSerializer.Meta):
+        fields = InspectionChecklistUpdateSerializer.Meta.fields + ['attachment_file']
+
+    def validate(self, data):
+        # The uploaded file is only saved as a photo once the whole inspection is accepted
+        if data.get('attachment_file') is not None:
+            return data
+
+        return super().validate(data)
+
+
 class InspectionGenericSerializer(serializers.ModelSerializer):
     distributor = DistributorGenericSerializer()
     inspector = UserGenericSerializer()
+    status = serializers.IntegerField(source='get_effective_status', read_only=True)
 
     class Meta:
         model = Inspection
@@ -57,23 +82,25 @@ class InspectionGenericSerializer(serializers.ModelSerializer):
             'status', 'account_manager_image', 'finance_awb_image', 'created', 'updated'
         ]
         depth = 2
+        source_fields = {'status': ['status', 'date_initial']}
 
 
-class InspectionListSerializer(serializers.ModelSerializer):
+class InspectionListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     distributor = DistributorGenericSerializer()
     inspector = UserGenericSerializer()
     account_manager = UserGenericSerializer()
     finance_manager = UserGenericSerializer()
-    status = serializers.CharField(source='get_status_display')
+    status = serializers.CharField(source='get_effective_status_display')
 
     class Meta:
         model = Inspection
         fields = [
             'id', 'serial_no', 'date_initial', 'distributor', 'inspector', 'total_mark', 'total_rating',
             'account_manager', 'account_manager_image', 'account_is_read', 'finance_manager', 'finance_awb_image',
-            'finance_awb_no', 'finance_record_no', 'finance_is_read', 'status', 'created', 'updated'
+            'finance_awb_no', 'finance_record_no', 'finance_is_read', 'status', 'version', 'created', 'updated'
         ]
         depth = 2
+        source_fields = {'status': ['status', 'date_initial']}
 
 
 class InspectionSerializer(serializers.ModelSerializer):
@@ -82,17 +109,29 @@ class InspectionSerializer(serializers.ModelSerializer):
     account_manager = UserGenericSerializer()
     finance_manager = UserGenericSerializer()
     checklists = InspectionChecklistSerializer(many=True, required=False)
+    status = serializers.IntegerField(source='get_effective_status', read_only=True)
 
     class Meta:
         model = Inspection
         fields = [
             'id', 'serial_no', 'date_initial', 'distributor', 'inspector', 'total_mark', 'total_rating',
             'account_manager', 'account_manager_image', 'finance_manager', 'finance_awb_image', 'finance_awb_no',
-            'finance_record_no', 'status', 'created', 'updated', 'checklists'
+            'finance_record_no', 'status', 'version', 'created', 'updated', 'checklists'
         ]
         depth = 2
 
 
+class InspectionChangeSerializer(serializers.ModelSerializer):
+    status = serializers.IntegerField(source='get_effective_status', read_only=True)
+
+    class Meta:
+        model = Inspection
+        fields = [
+            'id', 'serial_no', 'date_initial', 'distributor', 'total_mark', 'total_rating', 'status', 'version',
+            'created', 'updated'
+        ]
+
+
 class InspectionUpdateSerializer(serializers.ModelSerializer):
     checklists = InspectionChecklistUpdateSerializer(many=True)
 
@@ -102,26 +141,59 @@ class InspectionUpdateSerializer(serializers.ModelSerializer):
             'id', 'total_mark', 'total_rating', 'status', 'updated', 'checklists'
         ]
 
-    def update(self, instance, validated_data):
-        checklists_data = validated_data.pop('checklists')
-        checklists = instance.checklists.all()
-        checklists = list(checklists)
+    def validate_checklists(self, value):
+        ids = {item['id'] for item in value if item.get('id') is not None}
+
+        if self.instance is not None:
+            checklists = sorted(self.instance.checklists.all(), key=lambda checklist: checklist.pk)
+            unknown = ids - {checklist.pk for checklist in checklists}
+
+            if unknown:
+                raise serializers.ValidationError(
+                    'Checklist items %s do not belong to this inspection' % ', '.join(str(pk) for pk in sorted(unknown))
+                )
+
+            # Resolved the way apply_checklists does, so items matched by position are counted as well
+            submitted_ids = [
+                item['id'] if item.get('id') is not None else checklists[index].pk
+                for index, item in enumerate(value) if item.get('id') is not None or index < len(checklists)
+            ]
+        else:
+            submitted_ids = [item['id'] for item in value if item.get('id') is not None]
+
+        if len(set(submitted_ids)) != len(submitted_ids):
+            raise serializers.ValidationError('A checklist item can only be submitted once')
+
+        return value
+
+    @staticmethod
+    def apply_checklists(instance, checklists_data, now):
+        """
+        Copy the submitted responses onto the inspection and its checklist items without saving them.
+        Returns the changed checklist items.
+        """
+        checklists = sorted(instance.checklists.all(), key=lambda checklist: checklist.pk)
+        checklists_by_id = {checklist.pk: checklist for checklist in checklists}
 
         full_marks = 0
         total_marks = 0
         total_rating = 0
+        updated_checklists = []
 
-        for checklist_data in checklists_data:
-            photo = None
-
-            if checklist_data['attachment']:
-                photo = checklist_data['attachment']
+        for index, checklist_data in enumerate(checklists_data):
+            # Items without an id are matched by position, as older app versions do not send it
+            if checklist_data.get('id') is not None:
+                checklist = checklists_by_id[checklist_data['id']]
+            elif index < len(checklists):
+                checklist = checklists[index]
+            else:
+                continue
 
-            checklist = checklists.pop(0)
             checklist.response = checklist_data.get('response', checklist.response)
             checklist.note = checklist_data.get('note', checklist.note)
-            checklist.attachment = photo
-            checklist.save()
+            checklist.attachment = checklist_data.get('attachment') or None
+            checklist.updated = now
+            updated_checklists.append(checklist)
 
             full_marks += checklist.weight
 
@@ -129,21 +201,41 @@ class InspectionUpdateSerializer(serializers.ModelSerializer):
                 total_marks += checklist.weight
                 total_rating += 1
 
-        instance.total_mark = total_marks / full_marks * 100 if full_marks else 0
-        instance.total_rating = total_rating / len(checklists_data) * 10 if full_marks else 0
+        instance.total_mark = Inspection.round_mark(total_marks / full_marks * 100) if full_marks else 0
+        instance.total_rating = round(total_rating / len(checklists_data) * 10, 2) if full_marks else 0
         instance.status = Inspection.STATUS_COMPLETED
-        instance.save()
+        instance.version += 1
+        instance.updated = now
 
-        # Update Distributor data
-        Distributor.objects.filter(pk=instance.distributor.pk).update(
-            total_visits=F('total_visits') + 1,
-            ratings=(F('ratings') * F('total_visits') + instance.total_rating) / (F('total_visits') + 1)
+        return updated_checklists
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        checklists = self.apply_checklists(instance, validated_data.pop('checklists'), timezone.now())
+
+        InspectionChecklist.objects.bulk_update(checklists, fields=['response', 'note', 'attachment', 'updated'])
+
+        # Only one of two concurrent submissions of the same form gets through
+        transition(
+            Inspection.objects.filter(pk=instance.pk),
+            version=instance.version - 1,
+            allowed=Inspection.OPEN_STATUSES,
+            total_mark=instance.total_mark,
+            total_rating=instance.total_rating,
+            status=instance.status
         )
 
+        # The distributor lifetime totals are folded in by the outbox job
+        record_ratings([instance])
+
         return instance
 
 
-class InspectionNotificationListSerializer(serializers.ModelSerializer):
+class InspectionSyncSerializer(InspectionUpdateSerializer):
+    checklists = InspectionChecklistSyncSerializer(many=True)
+
+
+class InspectionNotificationListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     inspection = InspectionGenericSerializer()
     generated_by = UserGenericSerializer()
 
@@ -153,7 +245,7 @@ class InspectionNotificationListSerializer(serializers.ModelSerializer):
         depth = 2
 
 
-class InspectionLogListSerializer(serializers.ModelSerializer):
+class InspectionLogListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     inspection = InspectionGenericSerializer()
     user = UserGenericSerializer()
     status = serializers.CharField(source='get_type_display')
@@ -0,0 +1,191 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+from distributors.models import Distributor
+from .models import DistributorStat, Inspection
+
+UPSERT_SQL = (
+    'INSERT INTO {table} (distributor_id, period, period_start, count, rating_sum, rating_sq_sum, mark_sum, '
+    'mark_sq_sum, created, updated) VALUES {values} '
+    'ON CONFLICT (distributor_id, period, period_start) DO UPDATE SET '
+    'count = {table}.count + EXCLUDED.count, '
+    'rating_sum = {table}.rating_sum + EXCLUDED.rating_sum, '
+    'rating_sq_sum = {table}.rating_sq_sum + EXCLUDED.rating_sq_sum, '
+    'mark_sum = {table}.mark_sum + EXCLUDED.mark_sum, '
+    'mark_sq_sum = {table}.mark_sq_sum + EXCLUDED.mark_sq_sum, '
+    'updated = EXCLUDED.updated'
+)
+
+REBUILD_SQL = (
+    'INSERT INTO {stats} (distributor_id, period, period_start, count, rating_sum, rating_sq_sum, mark_sum, '
+    'mark_sq_sum, created, updated) '
+    'SELECT distributor_id, %s, {period_start}, COUNT(*), SUM(total_rating), SUM(total_rating * total_rating), '
+    'SUM(total_mark), SUM(total_mark::bigint * total_mark), %s, %s '
+    'FROM {inspections} WHERE status BETWEEN %s AND %s GROUP BY 1, 3'
+)
+
+
+def record_ratings(inspections):
+    """
+    Add the ratings and marks of submitted inspections to the day and month rows of their distributors,
+    with one INSERT ... ON CONFLICT statement. Call inside the submission transaction.
+    """
+    totals = defaultdict(lambda: [0, 0.0, 0.0, 0, 0])
+
+    for inspection in inspections:
+        day = inspection.date_initial
+        rating = float(inspection.total_rating)
+        mark = int(inspection.total_mark)
+
+        for key in [
+            (inspection.distributor_id, DistributorStat.PERIOD_DAY, day),
+            (inspection.distributor_id, DistributorStat.PERIOD_MONTH, day.replace(day=1))
+        ]:
+            total = totals[key]
+            total[0] += 1
+            total[1] += rating
+            total[2] += rating * rating
+            total[3] += mark
+            total[4] += mark * mark
+
+    if not totals:
+        return
+
+    now = timezone.now()
+    params = []
+
+    # Sorted so concurrent submissions always lock the rows in the same order
+    for key in sorted(totals):
+        params += [*key, *totals[key], now, now]
+
+    sql = UPSERT_SQL.format(
+        table=connection.ops.quote_name(DistributorStat._meta.db_table),
+        values=', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(totals))
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def fold_distributor_ratings(ratings):
+    """
+    Fold ``(distributor_id, rating)`` pairs of submitted inspections into the lifetime totals of their
+    distributors with a single UPDATE.
+    """
+    visits = defaultdict(int)
+    totals = defaultdict(Decimal)
+
+    for distributor_id, rating in ratings:
+        visits[distributor_id] += 1
+        totals[distributor_id] += Decimal(str(rating))
+
+    if not visits:
+        return
+
+    new_visits = Case(
+        *[When(pk=pk, then=Value(count)) for pk, count in visits.items()], output_field=IntegerField()
+    )
+    new_totals = Case(
+        *[When(pk=pk, then=Value(total)) for pk, total in totals.items()], output_field=DecimalField()
+    )
+
+    Distributor.objects.filter(pk__in=list(visits)).update(
+        total_visits=F('total_visits') + new_visits,
+        ratings=(F('ratings') * F('total_visits') + new_totals) / (F('total_visits') + new_visits),
+        updated=timezone.now()
+    )
+
+
+def get_window_filter(start, end):
+    """
+    Cover ``start`` to ``end`` (inclusive) with month rows for the whole months and day rows for the rest,
+    so a window never reads more than two partial months of day rows.
+    """
+    query = Q(pk__in=[])
+    months = []
+    month = start.replace(day=1)
+
+    while month <= end:
+        month_end = month.replace(day=monthrange(month.year, month.month)[1])
+        low, high = max(start, month), min(end, month_end)
+
+        if low == month and high == month_end:
+            months.append(month)
+        else:
+            query |= Q(period=DistributorStat.PERIOD_DAY, period_start__range=(low, high))
+
+        month = month_end + timedelta(days=1)
+
+    if months:
+        query |= Q(period=DistributorStat.PERIOD_MONTH, period_start__in=months)
+
+    return query
+
+
+def summarize(count, rating_sum, rating_sq_sum, mark_sum, mark_sq_sum):
+    if not count:
+        return {'count': 0, 'rating': None, 'rating_variance': None, 'mark': None, 'mark_variance': None}
+
+    rating = rating_sum / count
+    mark = mark_sum / count
+
+    return {
+        'count': count,
+        'rating': round(rating, 2),
+        'rating_variance': round(max(rating_sq_sum / count - rating * rating, 0), 4),
+        'mark': round(mark, 2),
+        'mark_variance': round(max(mark_sq_sum / count - mark * mark, 0), 4)
+    }
+
+
+def get_stats(distributor_ids, start, end):
+    """
+    Return the visit count, mean and variance of the ratings and marks of every distributor in
+    ``distributor_ids`` over the inspections dated ``start`` to ``end``.
+    """
+    rows = DistributorStat.objects.filter(get_window_filter(start, end), distributor_id__in=distributor_ids).values(
+        'distributor_id'
+    ).annotate(
+        count_total=Sum('count'),
+        rating_total=Sum('rating_sum'),
+        rating_sq_total=Sum('rating_sq_sum'),
+        mark_total=Sum('mark_sum'),
+        mark_sq_total=Sum('mark_sq_sum')
+    )
+    stats = {pk: summarize(0, 0, 0, 0, 0) for pk in distributor_ids}
+
+    for row in rows:
+        stats[row['distributor_id']] = summarize(
+            row['count_total'], row['rating_total'], row['rating_sq_total'], row['mark_total'], row['mark_sq_total']
+        )
+
+    return stats
+
+
+@transaction.atomic
+def rebuild_stats():
+    """
+    Recompute every stats row of the current tenant from the submitted inspections.
+    """
+    stats = connection.ops.quote_name(DistributorStat._meta.db_table)
+    inspections = connection.ops.quote_name(Inspection._meta.db_table)
+    low, high = Inspection.STATUS_BUCKETS['complete']
+    now = timezone.now()
+
+    DistributorStat.objects.all().delete()
+
+    with connection.cursor() as cursor:
+        for period, period_start in [
+            (DistributorStat.PERIOD_DAY, 'date_initial'),
+            (DistributorStat.PERIOD_MONTH, "date_trunc('month', date_initial)::date")
+        ]:
+            cursor.execute(
+                REBUILD_SQL.format(stats=stats, inspections=inspections, period_start=period_start),
+                [period, now, now, low, high]
+            )
+
+    return {'stats': DistributorStat.objects.count()}
@@ -0,0 +1,162 @@
+import json
+from django.db import transaction
+from django.utils import timezone
+from photo.models import Photo
+from .models import Inspection, InspectionChecklist
+from .outbox import record_submissions
+from .serializers import InspectionSyncSerializer
+from .stats import record_ratings
+
+SYNC_LIMIT = 100
+
+
+class SyncError(Exception):
+    pass
+
+
+def parse_submissions(data):
+    """
+    Read the submitted inspections from a JSON body or from the ``inspections`` field of a multipart body.
+
+    In a multipart body a checklist item may name an uploaded file in ``attachment_file`` instead of
+    sending the id of an already uploaded photo.
+    """
+    submissions = data.get('inspections')
+
+    if isinstance(submissions, str):
+        try:
+            submissions = json.loads(submissions)
+        except ValueError:
+            raise SyncError('Inspections must be a JSON list')
+
+    if not isinstance(submissions, list) or not submissions:
+        raise SyncError('Inspections field is required')
+
+    if len(submissions) > SYNC_LIMIT:
+        raise SyncError('At most %d inspections can be submitted at once' % SYNC_LIMIT)
+
+    if not all(isinstance(submission, dict) and isinstance(submission.get('checklists'), list)
+               for submission in submissions):
+        raise SyncError('Every inspection needs an id and a list of checklists')
+
+    try:
+        ids = [int(submission.get('id')) for submission in submissions]
+    except (TypeError, ValueError):
+        raise SyncError('Every inspection needs an id and a list of checklists')
+
+    if len(set(ids)) != len(ids):
+        raise SyncError('An inspection can only be submitted once per request')
+
+    return dict(zip(ids, submissions))
+
+
+def get_missing_files(checklists_data, files):
+    return {item['attachment_file'] for item in checklists_data if item.get('attachment_file') is not None} - set(files)
+
+
+def store_attachments(checklists_data, files, photos):
+    """
+    Save the uploaded files named by ``attachment_file`` in the validated checklist items of an accepted
+    inspection as photos and put them in place. ``photos`` holds the photos already saved by name, as one
+    file can be named by several inspections.
+    """
+    created = []
+
+    for item in checklists_data:
+        name = item.pop('attachment_file', None)
+
+        if name is None:
+            continue
+
+        if name not in photos:
+            photo = Photo(name=files[name].name[:48])
+            photo.attachment.save(files[name].name, files[name], save=False)
+            photos[name] = photo
+            created.append(photo)
+
+        item['attachment'] = photos[name]
+
+    Photo.objects.bulk_create(created)
+
+
+def get_submission_error(instance, user):
+    if instance is None:
+        return 'Inspection not found'
+
+    if instance.inspector_id != user.pk:
+        return 'You are not authorized to submit this form'
+
+    if instance.status not in Inspection.OPEN_STATUSES:
+        return 'This form has already been submitted'
+
+    return None
+
+
+def sync_inspections(submissions, user, files=None):
+    """
+    Validate and submit many inspections of ``user`` together.
+
+    Every inspection is validated on its own, so one bad form does not hold back the rest. The valid ones
+    are written with one bulk statement per table and queued in the outbox. Uploaded files are only saved
+    for accepted inspections, and removed again when the transaction fails. Returns a result per inspection
+    id and the submitted inspections.
+    """
+    results = {}
+    submitted = []
+    checklists = []
+    photos = {}
+    files = files or {}
+    now = timezone.now()
+
+    try:
+        with transaction.atomic():
+            instances = Inspection.objects.select_for_update(of=('self',)).prefetch_related('checklists').in_bulk(
+                list(submissions)
+            )
+
+            for pk, submission in submissions.items():
+                instance = instances.get(pk)
+                error = get_submission_error(instance, user)
+
+                if error is not None:
+                    results[pk] = {'status': 'error', 'errors': error}
+                    continue
+
+                serializer = InspectionSyncSerializer(instance, data=submission, partial=False)
+
+                if not serializer.is_valid():
+                    results[pk] = {'status': 'error', 'errors': serializer.errors}
+                    continue
+
+                checklists_data = serializer.validated_data['checklists']
+
+                if get_missing_files(checklists_data, files):
+                    results[pk] = {'status': 'error', 'errors': 'An attachment file is missing from the request'}
+                    continue
+
+                store_attachments(checklists_data, files, photos)
+                checklists += serializer.apply_checklists(instance, checklists_data, now)
+                submitted.append(instance)
+                results[pk] = {
+                    'status': 'success',
+                    'total_mark': instance.total_mark,
+                    'total_rating': instance.total_rating
+                }
+
+            if submitted:
+                InspectionChecklist.objects.bulk_update(
+                    checklists, fields=['response', 'note', 'attachment', 'updated']
+                )
+                Inspection.objects.bulk_update(
+                    submitted, fields=['total_mark', 'total_rating', 'status', 'version', 'updated']
+                )
+                record_ratings(submitted)
+                record_submissions(submitted, user)
+    except Exception:
+        # A rollback leaves the saved files behind
+        for photo in photos.values():
+            photo.attachment.delete(save=False)
+
+        raise
+
+    return results, submitted
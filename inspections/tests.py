@@ -1,3 +1,637 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from auth.models import User
+from config import fines
+from config.fines import compile_rules, get_fine
+from config.models import Fine
+from gbqa.fast import get_compiled_serializer
+from gbqa.renderers import dumps
+from distributors.models import Distributor, DistributorType, DistributorWarning
+from photo.models import Photo
+from .changes import get_changes
+from .maintenance import reprice_fines
+from .models import Inspection, InspectionChecklist, InspectionLog, InspectionNotification, Tombstone
+from .rescoring import rescore
+from .serializers import InspectionListSerializer, InspectionUpdateSerializer
+from .sync import sync_inspections
 
-# Create your tests here.
+
+def create_distributor(distributor_type, inspector=None, **kwargs):
+    return Distributor.objects.create(
+        name=kwargs.pop('name', 'Distributor'), distributor_type=distributor_type, inspector=inspector,
+        visit_frequency=Distributor.FREQUENCY_DAILY, language_preferences='EN', **kwargs
+    )
+
+
+def create_inspection(distributor, inspector=None, **kwargs):
+    kwargs.setdefault('status', Inspection.STATUS_PENDING)
+
+    return Inspection.objects.create(
+        serial_no=kwargs.pop('serial_no', 'SN 000001'), distributor=distributor, inspector=inspector, **kwargs
+    )
+
+
+class ScoringTestCase(TenantTestCase):
+    def setUp(self):
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.distributor_type = DistributorType.objects.create(name='Shop')
+        self.distributor = create_distributor(self.distributor_type, self.inspector)
+        self.inspection = create_inspection(self.distributor, self.inspector)
+
+    def score(self, *items):
+        """
+        Submit ``(weight, response)`` items and return the unsaved inspection.
+        """
+        checklists = [
+            InspectionChecklist.objects.create(
+                inspection=self.inspection, detail_en='Item %d' % index, detail_ar='Item %d' % index, weight=weight
+            )
+            for index, (weight, _) in enumerate(items)
+        ]
+        inspection = Inspection.objects.prefetch_related('checklists').get(pk=self.inspection.pk)
+        InspectionUpdateSerializer.apply_checklists(inspection, [
+            {'id': checklist.pk, 'response': response} for checklist, (_, response) in zip(checklists, items)
+        ], timezone.now())
+
+        return inspection
+
+    def test_mark_and_rating(self):
+        inspection = self.score((3, True), (1, False))
+
+        self.assertEqual(inspection.total_mark, 75)
+        self.assertEqual(inspection.total_rating, 5)
+        self.assertEqual(inspection.status, Inspection.STATUS_COMPLETED)
+
+    def test_mark_is_truncated(self):
+        self.assertEqual(self.score((159, True), (41, False)).total_mark, 79)
+
+    def test_mark_below_half_rounds_down(self):
+        self.assertEqual(self.score((794, True), (206, False)).total_mark, 79)
+
+    def test_no_weights_scores_zero(self):
+        inspection = self.score((0, True))
+
+        self.assertEqual(inspection.total_mark, 0)
+        self.assertEqual(inspection.total_rating, 0)
+
+    def test_truncated_mark_is_fined(self):
+        Fine.objects.create(amount=500, threshold=80)
+        rules = compile_rules()
+
+        self.assertEqual(get_fine('Shop', self.score((159, True), (41, False)).total_mark, rules), 500)
+        self.assertIsNone(get_fine('Shop', 80, rules))
+
+
+class RescoreTestCase(TenantTestCase):
+    def setUp(self):
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.distributor_type = DistributorType.objects.create(name='Shop')
+        self.distributor = create_distributor(self.distributor_type, self.inspector)
+
+    def submit(self, *items):
+        """
+        Create an inspection with ``(weight, response)`` items, submit those with a response and return it.
+        """
+        inspection = create_inspection(self.distributor, self.inspector)
+        checklists = [
+            InspectionChecklist.objects.create(
+                inspection=inspection, detail_en='Item %d' % index, detail_ar='Item %d' % index, weight=weight
+            )
+            for index, (weight, _) in enumerate(items)
+        ]
+        inspection = Inspection.objects.prefetch_related('checklists').get(pk=inspection.pk)
+
+        for checklist in InspectionUpdateSerializer.apply_checklists(inspection, [
+            {'id': checklist.pk, 'response': response}
+            for checklist, (_, response) in zip(checklists, items) if response is not None
+        ], timezone.now()):
+            checklist.save()
+
+        inspection.save()
+
+        return inspection
+
+    def test_rescore_matches_submission(self):
+        inspection = self.submit((159, True), (41, False), (100, None))
+        Inspection.objects.filter(pk=inspection.pk).update(total_mark=0, total_rating=0)
+
+        result = rescore()
+        inspection.refresh_from_db()
+        self.distributor.refresh_from_db()
+
+        self.assertEqual(result['inspections'], 1)
+        self.assertEqual(inspection.total_mark, 79)
+        self.assertEqual(inspection.total_rating, 5)
+        self.assertEqual(self.distributor.total_visits, 1)
+        self.assertEqual(self.distributor.ratings, 5)
+
+    def test_unchanged_inspection_is_not_written(self):
+        self.submit((3, True), (1, False))
+
+        self.assertEqual(rescore()['inspections'], 0)
+
+    def test_inspection_without_items_is_a_visit(self):
+        self.submit((1, True))
+        create_inspection(self.distributor, self.inspector, status=Inspection.STATUS_COMPLETED, total_rating=4)
+
+        rescore()
+        self.distributor.refresh_from_db()
+
+        self.assertEqual(self.distributor.total_visits, 2)
+        self.assertEqual(self.distributor.ratings, 7)
+
+    def test_distributor_without_submissions_is_reset(self):
+        self.submit((1, True))
+        other = create_distributor(self.distributor_type, self.inspector, total_visits=3, ratings=7.5)
+
+        rescore()
+        other.refresh_from_db()
+
+        self.assertEqual(other.total_visits, 0)
+        self.assertEqual(other.ratings, 0)
+
+
+class RepriceFinesTestCase(TenantTestCase):
+    def setUp(self):
+        # The rules are cached per version, which is only bumped once a transaction commits
+        cache.clear()
+        fines._local.clear()
+        self.set_rules((80, 500))
+
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.distributor = create_distributor(DistributorType.objects.create(name='Shop'), self.inspector)
+
+    def set_rules(self, *rules):
+        with self.captureOnCommitCallbacks(execute=True):
+            Fine.objects.all().delete()
+
+            for threshold, amount in rules:
+                Fine.objects.create(threshold=threshold, amount=amount)
+
+    def submit(self, mark, fine=None, role='supervisor'):
+        """
+        Create an inspection submitted with ``mark`` and notified to ``role``, fined ``fine`` when given.
+        """
+        inspection = create_inspection(
+            self.distributor, self.inspector, status=Inspection.STATUS_COMPLETED, total_mark=mark
+        )
+        notification = InspectionNotification.objects.create(inspection=inspection, title='Visit score', role=role)
+
+        if fine is not None:
+            warning = DistributorWarning.objects.create(
+                distributor=self.distributor, amount=fine, type=DistributorWarning.TYPE_GENERATED,
+                status=DistributorWarning.STATUS_PENDING
+            )
+            warning.notifications.add(notification)
+
+        return inspection
+
+    def test_raised_threshold_fines_past_inspections(self):
+        inspection = self.submit(85)
+        self.submit(95)
+        reprice_fines()
+        self.set_rules((90, 700))
+
+        self.assertEqual(reprice_fines(), {'repriced': 0, 'withdrawn': 0, 'fined': 1})
+
+        warning = DistributorWarning.objects.get()
+        self.assertEqual((warning.amount, warning.status), (700, DistributorWarning.STATUS_PENDING))
+        self.assertEqual(warning.notifications.get().inspection, inspection)
+
+    def test_inspection_approved_past_supervisor_is_fined(self):
+        inspection = self.submit(85, role='account')
+        self.set_rules((90, 700))
+
+        self.assertEqual(reprice_fines(), {'repriced': 0, 'withdrawn': 0, 'fined': 1})
+        self.assertEqual(DistributorWarning.objects.get().notifications.get().inspection, inspection)
+
+    def test_fined_inspection_is_not_fined_again(self):
+        self.submit(85)
+        self.set_rules((90, 700))
+        reprice_fines()
+
+        self.assertEqual(reprice_fines(force=True), {'repriced': 0, 'withdrawn': 0, 'fined': 0})
+        self.assertEqual(DistributorWarning.objects.count(), 1)
+
+    def test_pending_fines_are_repriced_and_withdrawn(self):
+        self.submit(75, fine=500)
+        self.submit(65, fine=500)
+        self.set_rules((70, 300))
+
+        self.assertEqual(reprice_fines(), {'repriced': 1, 'withdrawn': 1, 'fined': 0})
+        self.assertEqual(
+            sorted(DistributorWarning.objects.values_list('amount', 'status')),
+            [(300, DistributorWarning.STATUS_PENDING), (500, DistributorWarning.STATUS_REJECTED)]
+        )
+
+    def test_unchanged_rules_are_skipped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reprice_fines()
+
+        self.submit(50)
+
+        self.assertEqual(reprice_fines(), {'repriced': 0, 'withdrawn': 0, 'fined': 0})
+        self.assertFalse(DistributorWarning.objects.exists())
+
+
+class InspectionActionTestCase(TenantTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin@test.com', first_name='Admin', is_superuser=True)
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.inspection = create_inspection(create_distributor(DistributorType.objects.create(name='Shop')))
+        self.client = APIClient(HTTP_HOST=self.get_test_tenant_domain())
+        self.client.force_authenticate(self.user)
+
+    def act(self, **data):
+        return self.client.put(reverse('inspections-action', args=[self.inspection.pk]), data, format='json')
+
+    def test_reassign(self):
+        response = self.act(action='reassign', inspector_id=self.inspector.pk, version=1)
+        self.inspection.refresh_from_db()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.inspection.inspector, self.inspector)
+        self.assertEqual(self.inspection.version, 2)
+
+    def test_unknown_inspector_is_rejected(self):
+        response = self.act(action='reassign', inspector_id=self.inspector.pk + 100)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'Inspector not found'})
+
+    def test_unknown_photo_is_rejected(self):
+        self.assertEqual(self.act(action='account_image', account_image=999).data, {'error': 'Photo not found'})
+        self.assertEqual(self.act(action='account_image', account_image='x').status_code, 400)
+
+        self.inspection.refresh_from_db()
+        self.assertEqual(self.inspection.version, 1)
+
+
+class CompiledListTestCase(TenantTestCase):
+    def setUp(self):
+        photo = Photo.objects.create(name='Photo', attachment='photo_files/photo.jpg')
+        manager = User.objects.create(username='manager@test.com', first_name='Manager', photo=photo)
+        inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        distributor = create_distributor(DistributorType.objects.create(name='Shop', photo=photo), inspector)
+
+        create_inspection(
+            distributor, inspector, account_manager=manager, account_manager_image=photo,
+            status=Inspection.STATUS_COMPLETED, total_mark=80, total_rating=7.5
+        )
+        create_inspection(distributor, serial_no='SN 000002')
+
+    def assertRendersAlike(self, **params):
+        request = Request(APIRequestFactory().get('/api/inspections/', params, HTTP_HOST=self.get_test_tenant_domain()))
+        context = {'request': request}
+        queryset = Inspection.objects.order_by('pk')
+        serializer = InspectionListSerializer(queryset, many=True, context=context)
+        compiled = get_compiled_serializer(serializer, Inspection)
+
+        self.assertIsNotNone(compiled)
+        self.assertEqual(dumps(compiled.render(compiled.values(queryset), context)), dumps(serializer.data))
+
+    def test_all_fields(self):
+        self.assertRendersAlike()
+
+    def test_expand(self):
+        self.assertRendersAlike(expand='distributor,account_manager_image')
+        self.assertRendersAlike(expand='*')
+
+    def test_fields(self):
+        self.assertRendersAlike(fields='id,status,distributor.name,account_manager.photo')
+        self.assertRendersAlike(fields='id,account_manager_image', expand='account_manager_image')
+
+    def test_photo_url_is_absolute(self):
+        request = Request(APIRequestFactory().get('/', HTTP_HOST=self.get_test_tenant_domain()))
+        serializer = InspectionListSerializer(
+            Inspection.objects.order_by('pk'), many=True, context={'request': request}, expand='*'
+        )
+        compiled = get_compiled_serializer(serializer, Inspection)
+        rows = compiled.render(compiled.values(Inspection.objects.order_by('pk')), {'request': request})
+
+        self.assertEqual(
+            rows[0]['account_manager_image']['attachment'],
+            'http://%s/media/photo_files/photo.jpg' % self.get_test_tenant_domain()
+        )
+        self.assertIsNone(rows[1]['account_manager_image'])
+
+
+class ConditionalGetTestCase(TenantTestCase):
+    def setUp(self):
+        distributor = create_distributor(DistributorType.objects.create(name='Shop'))
+        self.inspection = create_inspection(distributor)
+        self.checklist = InspectionChecklist.objects.create(
+            inspection=self.inspection, detail_en='Item', detail_ar='Item', weight=1
+        )
+        create_inspection(distributor, serial_no='SN 000002')
+        self.client = APIClient(HTTP_HOST=self.get_test_tenant_domain())
+        self.client.force_authenticate(User.objects.create(username='user@test.com', first_name='User'))
+
+    def assertModified(self, url, change):
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        change()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_deleted_item_changes_the_detail(self):
+        self.assertModified(reverse('inspections-detail', args=[self.inspection.pk]), self.checklist.delete)
+
+    def test_deleted_inspection_changes_the_list(self):
+        self.assertModified(reverse('inspections-list'), self.inspection.delete)
+
+    def test_version_changes_the_list(self):
+        self.assertModified(
+            reverse('inspections-list'),
+            lambda: Inspection.objects.filter(pk=self.inspection.pk).update(version=2, updated=self.inspection.updated)
+        )
+
+
+class KeysetPaginationTestCase(TenantTestCase):
+    def setUp(self):
+        distributor = create_distributor(DistributorType.objects.create(name='Shop'))
+        now = timezone.now()
+
+        for index in range(5):
+            create_inspection(distributor, serial_no='SN %06d' % index)
+
+        # Two rows share an updated time, so only the id orders them
+        for index, inspection in enumerate(Inspection.objects.order_by('pk')):
+            Inspection.objects.filter(pk=inspection.pk).update(updated=now - timedelta(minutes=min(index, 3)))
+
+        self.expected = list(Inspection.objects.order_by('-updated', '-pk').values_list('pk', flat=True))
+        self.client = APIClient(HTTP_HOST=self.get_test_tenant_domain())
+        self.client.force_authenticate(User.objects.create(username='user@test.com', first_name='User'))
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        return response.data
+
+    def test_pages_follow_the_cursor(self):
+        data = self.get(reverse('inspections-list'), cursor='', per_page=2)
+        pages = [[row['id'] for row in data['inspections']]]
+
+        self.assertIsNone(data['pagination']['links']['previous'])
+        self.assertIsNone(data['pagination']['total'])
+
+        while data['pagination']['links']['next']:
+            data = self.get(data['pagination']['links']['next'])
+            pages.append([row['id'] for row in data['inspections']])
+
+        self.assertEqual(pages, [self.expected[0:2], self.expected[2:4], self.expected[4:]])
+
+    def test_previous_link_returns_the_page_before(self):
+        first = self.get(reverse('inspections-list'), cursor='', per_page=2)
+        second = self.get(first['pagination']['links']['next'])
+        previous = self.get(second['pagination']['links']['previous'])
+
+        self.assertEqual([row['id'] for row in previous['inspections']], self.expected[0:2])
+        self.assertIsNone(previous['pagination']['links']['previous'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(reverse('inspections-list'), {'cursor': 'x'}).status_code, 404)
+
+    def assertPagesAgree(self, url, key, **params):
+        numbered = []
+        data = self.get(url, per_page=2, **params)
+
+        while True:
+            numbered += [row['id'] for row in data[key]]
+
+            if not data['pagination']['links']['next']:
+                break
+
+            data = self.get(data['pagination']['links']['next'])
+
+        cursor = []
+        data = self.get(url, cursor='', per_page=2, **params)
+
+        while True:
+            cursor += [row['id'] for row in data[key]]
+
+            if not data['pagination']['links']['next']:
+                break
+
+            data = self.get(data['pagination']['links']['next'])
+
+        self.assertEqual(len(numbered), len(set(numbered)))
+        self.assertEqual(cursor, numbered)
+
+    def test_cursor_pages_keep_the_list_order(self):
+        self.assertPagesAgree(reverse('inspections-list'), 'inspections')
+        self.assertPagesAgree(reverse('inspections-list'), 'inspections', ordering='updated')
+
+    def test_cursor_pages_keep_the_log_order(self):
+        inspection = Inspection.objects.first()
+        created = timezone.now()
+
+        for index in range(5):
+            log = InspectionLog.objects.create(
+                inspection=inspection, title='Log %d' % index, subtitle='', type=InspectionLog.TYPE_SUCCESS
+            )
+            InspectionLog.objects.filter(pk=log.pk).update(created=created + timedelta(minutes=index % 2))
+
+        self.assertPagesAgree(reverse('inspections-log'), 'logs')
+
+
+class ChangesTestCase(TenantTestCase):
+    def setUp(self):
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.other = User.objects.create(username='other@test.com', first_name='Other')
+        self.distributor_type = DistributorType.objects.create(name='Shop')
+        self.distributor = create_distributor(self.distributor_type, self.other)
+        self.inspection = create_inspection(self.distributor, self.other)
+        self.item = InspectionChecklist.objects.create(
+            inspection=self.inspection, detail_en='Clean', detail_ar='نظيف', weight=2
+        )
+        self.since = timezone.now() - timedelta(days=1)
+
+        # Everything above was written an hour before the last sync, a day ago
+        written = self.since - timedelta(hours=1)
+        Inspection.objects.update(updated=written)
+        InspectionChecklist.objects.update(updated=written)
+        Distributor.objects.update(updated=written)
+
+    def test_full_sync_returns_assigned_rows(self):
+        changes = get_changes(self.other)
+
+        self.assertEqual([row['id'] for row in changes['inspections']], [self.inspection.pk])
+        self.assertEqual([row['id'] for row in changes['checklists']], [self.item.pk])
+        self.assertEqual([row['id'] for row in changes['distributors']], [self.distributor.pk])
+
+    def test_unchanged_rows_are_left_out(self):
+        changes = get_changes(self.other, since=self.since)
+
+        self.assertEqual(changes['inspections'], [])
+        self.assertEqual(changes['checklists'], [])
+
+    def test_changed_item_is_returned(self):
+        self.item.note = 'Dusty'
+        self.item.save()
+
+        changes = get_changes(self.other, since=self.since)
+
+        self.assertEqual([row['id'] for row in changes['checklists']], [self.item.pk])
+
+    def test_reassigned_inspection_comes_with_its_items(self):
+        Inspection.objects.filter(pk=self.inspection.pk).update(inspector=self.inspector, updated=timezone.now())
+
+        changes = get_changes(self.inspector, since=self.since)
+
+        self.assertEqual([row['id'] for row in changes['inspections']], [self.inspection.pk])
+        self.assertEqual([row['id'] for row in changes['checklists']], [self.item.pk])
+
+    def test_overdue_pending_inspection_is_returned(self):
+        Inspection.objects.filter(pk=self.inspection.pk).update(date_initial=self.since.date())
+
+        changes = get_changes(self.other, since=self.since)
+
+        self.assertEqual(
+            [(row['id'], row['status']) for row in changes['inspections']],
+            [(self.inspection.pk, Inspection.STATUS_INCOMPLETE)]
+        )
+
+    def test_deleted_inspection_is_reported(self):
+        Inspection.objects.filter(pk=self.inspection.pk).update(
+            status=Inspection.STATUS_DELETED, updated=timezone.now()
+        )
+
+        changes = get_changes(self.other, since=self.since)
+
+        self.assertEqual(changes['inspections'], [])
+        self.assertEqual(changes['checklists'], [])
+        self.assertEqual(changes['deleted']['inspections'], [self.inspection.pk])
+
+
+class TombstoneTestCase(TenantTestCase):
+    def setUp(self):
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.distributor = create_distributor(DistributorType.objects.create(name='Shop'), self.inspector)
+        self.inspections = [
+            create_inspection(self.distributor, self.inspector, serial_no='SN %06d' % index) for index in range(3)
+        ]
+
+    def test_distributor_delete_records_tombstones_at_once(self):
+        table = connection.ops.quote_name(Tombstone._meta.db_table)
+        distributor_id = self.distributor.pk
+
+        with CaptureQueriesContext(connection) as queries:
+            self.distributor.delete()
+
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('INSERT INTO %s' % table)]), 1)
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list('model', 'object_id', 'user')),
+            sorted([(Tombstone.MODEL_DISTRIBUTOR, distributor_id, self.inspector.pk)] + [
+                (Tombstone.MODEL_INSPECTION, inspection.pk, self.inspector.pk) for inspection in self.inspections
+            ])
+        )
+        self.assertFalse(Inspection.objects.exists())
+
+    def test_inspection_delete_records_tombstone(self):
+        inspection = self.inspections[0]
+        Inspection.objects.filter(pk=inspection.pk).update(status=Inspection.STATUS_INCOMPLETE)
+        client = APIClient(HTTP_HOST=self.get_test_tenant_domain())
+        client.force_authenticate(self.inspector)
+
+        self.assertEqual(client.delete(reverse('inspections-detail', args=[inspection.pk])).status_code, 200)
+        self.assertEqual(
+            list(Tombstone.objects.values_list('model', 'object_id', 'user')),
+            [(Tombstone.MODEL_INSPECTION, inspection.pk, self.inspector.pk)]
+        )
+
+
+class SyncTestCase(TenantTestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings.enable()
+
+        self.inspector = User.objects.create(username='inspector@test.com', first_name='Inspector')
+        self.other = User.objects.create(username='other@test.com', first_name='Other')
+        distributor = create_distributor(DistributorType.objects.create(name='Shop'), self.inspector)
+        self.own = create_inspection(distributor, self.inspector)
+        self.foreign = create_inspection(distributor, self.other, serial_no='SN 000002')
+
+        for inspection in [self.own, self.foreign]:
+            InspectionChecklist.objects.create(inspection=inspection, detail_en='Clean', detail_ar='نظيف', weight=1)
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root)
+
+    def submission(self, inspection, **item):
+        item.setdefault('response', False)
+        item.setdefault('note', None)
+
+        return {'id': inspection.pk, 'checklists': [{'id': inspection.checklists.get().pk, **item}]}
+
+    def upload(self):
+        return {'photo.jpg': SimpleUploadedFile('photo.jpg', b'jpeg', content_type='image/jpeg')}
+
+    def test_accepted_submission_stores_its_file(self):
+        results, submitted = sync_inspections(
+            {self.own.pk: self.submission(self.own, attachment_file='photo.jpg')}, self.inspector, self.upload()
+        )
+
+        self.assertEqual(results[self.own.pk]['status'], 'success')
+        self.assertEqual(submitted, [self.own])
+        self.assertEqual(self.own.checklists.get().attachment, Photo.objects.get())
+
+    def test_rejected_submission_stores_nothing(self):
+        results, submitted = sync_inspections(
+            {self.foreign.pk: self.submission(self.foreign, attachment_file='photo.jpg')}, self.inspector, self.upload()
+        )
+
+        self.assertEqual(results[self.foreign.pk], {
+            'status': 'error', 'errors': 'You are not authorized to submit this form'
+        })
+        self.assertEqual(submitted, [])
+        self.assertFalse(Photo.objects.exists())
+
+    def test_invalid_submission_stores_nothing(self):
+        results, _ = sync_inspections(
+            {self.own.pk: self.submission(self.own, attachment_file='photo.jpg', note='x' * 300)},
+            self.inspector, self.upload()
+        )
+
+        self.assertEqual(results[self.own.pk]['status'], 'error')
+        self.assertFalse(Photo.objects.exists())
+
+    def test_missing_file_is_an_error(self):
+        results, _ = sync_inspections(
+            {self.own.pk: self.submission(self.own, attachment_file='other.jpg')}, self.inspector, self.upload()
+        )
+
+        self.assertEqual(results[self.own.pk], {
+            'status': 'error', 'errors': 'An attachment file is missing from the request'
+        })
+        self.assertFalse(Photo.objects.exists())
+
+    def test_duplicate_items_are_rejected(self):
+        submission = self.submission(self.own, response=True)
+        submission['checklists'].append(submission['checklists'][0])
+
+        results, submitted = sync_inspections({self.own.pk: submission}, self.inspector)
+
+        self.assertEqual(results[self.own.pk], {
+            'status': 'error', 'errors': {'checklists': ['A checklist item can only be submitted once']}
+        })
+        self.assertEqual(submitted, [])
+
+    def test_false_response_needs_an_attachment(self):
+        results, _ = sync_inspections({self.own.pk: self.submission(self.own)}, self.inspector)
+
+        self.assertEqual(results[self.own.pk]['status'], 'error')
@@ -0,0 +1,49 @@
+from django.db.models import Q
+from distributors.models import Distributor
+from .models import Inspection, Tombstone
+
+
+def record_deleted_inspections(queryset):
+    """
+    Record tombstones for the inspections in ``queryset`` with one INSERT, so the inspector app can drop them on
+    its next sync. Call it in the transaction that deletes them.
+    """
+    Tombstone.objects.bulk_create([
+        Tombstone(model=Tombstone.MODEL_INSPECTION, object_id=pk, user_id=inspector_id)
+        for pk, inspector_id in queryset.values_list('pk', 'inspector_id')
+    ])
+
+
+def record_deleted(sender, instance, **kwargs):
+    """
+    pre_delete receiver for distributors, which records the tombstones of the distributor and of every
+    inspection its delete cascades to with one INSERT. Inspections have no receiver, so the cascade does not
+    load them one by one; delete them with record_deleted_inspections.
+    """
+    Tombstone.objects.bulk_create([
+        Tombstone(model=Tombstone.MODEL_DISTRIBUTOR, object_id=instance.pk, user_id=instance.inspector_id)
+    ] + [
+        Tombstone(model=Tombstone.MODEL_INSPECTION, object_id=pk, user_id=inspector_id)
+        for pk, inspector_id in Inspection.objects.filter(distributor=instance).values_list('pk', 'inspector_id')
+    ])
+
+
+def record_unassigned(model, object_id, inspector_id):
+    Tombstone.objects.create(model=model, object_id=object_id, user_id=inspector_id)
+
+
+def record_reassignment(inspector_id, distributor_ids):
+    """
+    Record tombstones for the inspectors that lose distributors when ``distributor_ids`` become the only
+    distributors of ``inspector_id``. Call before updating the distributors.
+    """
+    distributor_ids = {int(pk) for pk in distributor_ids if str(pk).strip()}
+    distributors = Distributor.objects.filter(
+        Q(inspector_id=inspector_id) | Q(pk__in=distributor_ids, inspector__isnull=False)
+    ).values_list('pk', 'inspector_id')
+
+    Tombstone.objects.bulk_create([
+        Tombstone(model=Tombstone.MODEL_DISTRIBUTOR, object_id=pk, user_id=user_id)
+        for pk, user_id in distributors
+        if (user_id == inspector_id) != (pk in distributor_ids)
+    ])
@@ -1,9 +1,10 @@
 from django.urls import path
 from .views import (
     InspectionGeneratorAPIView,
-    InspectionCronAPIView,
     InspectionListAPIView,
     InspectionRetrieveUpdateDestroyAPIView,
+    InspectionSyncAPIView,
+    InspectionChangesAPIView,
     InspectionActionUpdateAPIView,
     InspectionNotificationListAPIView,
     InspectionNotificationLogListAPIView,
@@ -15,9 +16,9 @@ from .views import (
 
 urlpatterns = [
     path('checklists', InspectionChecklistListView.as_view()),
-    path('generate', InspectionGeneratorAPIView.generate, name='inspection-generator'),
-    path('daily-update', InspectionCronAPIView.daily_update, name='inspection-daily-update'),
     path('reschedule', InspectionGeneratorAPIView.reschedule, name='inspection-reschedule'),
+    path('changes', InspectionChangesAPIView.as_view(), name='inspections-changes'),
+    path('sync', InspectionSyncAPIView.as_view(), name='inspections-sync'),
     path('reports', InspectionView.get_report, name='qa_report'),
     path('notifications', InspectionNotificationListAPIView.as_view(), name='inspections-notifications-list'),
     path(
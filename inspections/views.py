@@ -1,6 +1,7 @@
-from django.db.models import Prefetch, Max, Q, Count
+from django.db import transaction
+from django.db.models import Q, Count
 from django.views.decorators.csrf import csrf_exempt
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from datetime import date
 from rest_framework import filters, permissions
 from rest_framework.response import Response
@@ -13,12 +14,18 @@ from rest_framework.generics import (
 )
 from rest_framework.views import APIView
 from rest_framework import status
+from auth.models import User
+from gbqa.concurrency import VersionConflict, parse_version, reference_exists, transition
+from gbqa.mixins import CompiledSerializerMixin, ConditionalGetMixin, QueryPlanMixin
+from gbqa.pagination import KeysetPagination
+from photo.models import Photo
 from .models import (
     Checklist,
     Inspection,
     InspectionChecklist,
     InspectionNotification,
-    InspectionLog
+    InspectionLog,
+    Tombstone
 )
 from .serializers import (
     ChecklistSerializer,
@@ -35,87 +42,26 @@ from .filters import (
     InspectionLogFilterSet
 )
 from .utils import render_to_pdf
-from distributors.models import (
-    Distributor,
-    DistributorWarning,
-    WarningLog
-)
-from photo.models import Photo
+from .checklist_cache import get_checklist_data
+from .maintenance import reschedule_inspections
+from .outbox import record_submission
+from .changes import decode_cursor, get_changes
+from .sync import SyncError, parse_submissions, sync_inspections
+from .tombstones import record_deleted_inspections, record_unassigned
+from distributors.models import Distributor
 import django_excel as excel
 
 
 
 class InspectionGeneratorAPIView:
-    @api_view(['GET'])
-    @permission_classes([permissions.AllowAny])
-    def generate(request):
-        req_date = request.query_params.get('date', None)
-
-        if req_date is None:
-            req_date = date.today().strftime("%Y-%m-%d")
-
-        distributors = Distributor.objects.all()
-        count = 0
-
-        for distributor in distributors:
-            if distributor.inspector is None:
-                continue
-
-            inspection = Inspection.objects.filter(
-                date_initial=req_date,
-                distributor=distributor
-            ).first()
-
-            if inspection is not None:
-                continue
-
-            max_id = Inspection.objects.aggregate(Max('id'))
-
-            if max_id['id__max'] is None:
-                max_id['id__max'] = "0"
-
-            try:
-                new_serial = 'SN ' + str(int(max_id['id__max']) + 1).zfill(6)
-            except ValueError:
-                new_serial = None
-
-            inspection = Inspection(
-                serial_no=new_serial,
-                date_initial=req_date,
-                distributor=distributor,
-                inspector=distributor.inspector,
-                account_manager=distributor.account_manager,
-                total_mark=0,
-                total_rating=0,
-                status=Inspection.STATUS_PENDING
-            )
-            inspection.save()
-
-            checklists = Checklist.objects.filter(distributor_type=distributor.distributor_type).values()
-
-            for checklist in checklists:
-                inspection_checklist = InspectionChecklist(
-                    inspection=inspection,
-                    detail_en=checklist['detail_en'],
-                    detail_ar=checklist['detail_ar'],
-                    weight=checklist['weight']
-                )
-                inspection_checklist.save()
-
-            count += 1
-
-        return Response({
-            'message': 'Successfully added ' + str(count) + ' inspections'
-        }, status=status.HTTP_200_OK)
-
     @api_view(['POST'])
     @permission_classes([])
     def reschedule(request):
-        date = request.data.get('date')
+        req_date = request.data.get('date')
         distributors = request.data.get('distributors')
 
         # Validation check
-        if date is None:
+        if req_date is None:
             return Response({
                 'error': 'Date field is required'
             }, status=status.HTTP_400_BAD_REQUEST)
@@ -125,36 +71,30 @@ class InspectionGeneratorAPIView:
                 'error': 'Distributors field is required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Find all the inspections with distributor id
-        inspections = Inspection.objects.filter(
-            Q(status=Inspection.STATUS_PENDING) |
-            Q(status__range=[Inspection.STATUS_INCOMPLETE, Inspection.STATUS_INCOMPLETE_NOTIFIED])
-        ).filter(distributor__in=distributors)
-
-        counter = len(inspections)
+        try:
+            req_date = date.fromisoformat(req_date)
 
-        inspections.update(date_initial=date, status=Inspection.STATUS_PENDING)
-
-        return Response({
-            'message': 'Successfully rescheduled ' + str(counter) + ' inspections'
-        }, status=status.HTTP_200_OK)
+            if not isinstance(distributors, list):
+                distributors = str(distributors).split(',')
 
+            distributors = [int(distributor) for distributor in distributors]
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Date must be in YYYY-MM-DD format and distributors must be a list of ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-class InspectionCronAPIView:
-    @api_view(['GET'])
-    @permission_classes([permissions.AllowAny])
-    def daily_update(request):
-        Inspection.objects.filter(status=Inspection.STATUS_PENDING, date_initial__lt=date.today())\
-            .update(status=Inspection.STATUS_INCOMPLETE)
+        inspections = reschedule_inspections(distributors, req_date)
 
         return Response({
-            'message': 'Successfully updated incomplete inspections'
+            'message': 'Successfully rescheduled ' + str(len(inspections)) + ' inspections',
+            'inspections': inspections
         }, status=status.HTTP_200_OK)
 
 
-class InspectionListAPIView(ListAPIView):
+class InspectionListAPIView(ConditionalGetMixin, CompiledSerializerMixin, QueryPlanMixin, ListAPIView):
     queryset = Inspection.objects.all()
     serializer_class = InspectionListSerializer
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.OrderingFilter]
     ordering = ['serial_no']
@@ -174,43 +114,33 @@ class InspectionListAPIView(ListAPIView):
                 queryset = queryset.filter(date_initial__range=[date_range[0], date_range[1]])
 
         if self.request.query_params.get('status') is not None:
-            query_status = self.request.query_params.get('status').split(',')
-            qs = []
+            queryset = queryset.filter_status_buckets(self.request.query_params.get('status').split(','))
 
-            for st in query_status:
-                if st == 'pending':
-                    qs.append(Q(status=Inspection.STATUS_PENDING))
-                elif st == 'incomplete':
-                    qs.append(Q(status__range=[Inspection.STATUS_INCOMPLETE, Inspection.STATUS_INCOMPLETE_NOTIFIED]))
-                elif st == 'complete':
-                    qs.append(Q(status__range=[Inspection.STATUS_COMPLETED, Inspection.STATUS_SUPERVISOR_DECLINED]))
-
-            status_q = Q()
+        return queryset
 
-            for q in qs:
-                status_q = status_q | q
+    def list(self, request, *args, **kwargs):
+        # Exports read the nested distributor and inspector
+        fieldset = {'fields': '', 'expand': '*'} if request.query_params.get('export') == 'true' else {}
+        queryset = self.get_queryset()
+        not_modified = self.get_not_modified(queryset, **fieldset)
 
-            queryset = queryset.filter(status_q)
+        if not_modified is not None:
+            return not_modified
 
-        queryset = queryset.prefetch_related(Prefetch(
-            'checklists',
-            queryset=InspectionChecklist.objects.order_by('id',)
-        ))
+        compiled = self.get_compiled_serializer(queryset.model, **fieldset)
 
-        return queryset
+        if compiled is not None:
+            queryset = compiled.values(queryset)
+        else:
+            queryset = self.plan_queryset(queryset, **fieldset)
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
         inspection_filter = InspectionFilterSet(request.query_params, queryset=queryset)
 
         if request.query_params.get('export') == 'true':
-            serializer = self.get_serializer(inspection_filter.qs, many=True)
-
-            return self.export_list(data=serializer.data)
+            return self.export_list(data=self.serialize(inspection_filter.qs, compiled, **fieldset))
 
         page = self.paginate_queryset(inspection_filter.qs)
-        serializer = self.get_serializer(page, many=True)
-        paginated_data = self.get_paginated_response(serializer.data)
+        paginated_data = self.get_paginated_response(self.serialize(page, compiled, **fieldset))
 
         return Response({
             'message': 'Success',
@@ -244,13 +174,18 @@ class InspectionListAPIView(ListAPIView):
         return excel.make_response(sheet, 'xlsx', 200, 'All-Visits')
 
 
-class InspectionRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class InspectionRetrieveUpdateDestroyAPIView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     lookup_field = 'pk'
     serializer_class = InspectionSerializer
     permission_classes = [permissions.IsAuthenticated]
     queryset = Inspection.objects.all()
 
     def retrieve(self, request, *args, **kwargs):
+        not_modified = self.get_not_modified(self.get_queryset().filter(pk=self.kwargs[self.lookup_field]))
+
+        if not_modified is not None:
+            return not_modified
+
         instance = self.get_object()
         serializer = self.get_serializer(instance)
 
@@ -268,14 +203,7 @@ class InspectionRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
                 'error': 'You are not authorized to submit this form'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        pending_statuses = [
-            Inspection.STATUS_PENDING,
-            Inspection.STATUS_INCOMPLETE,
-            Inspection.STATUS_INCOMPLETE_NOTIFIED,
-            Inspection.STATUS_INCOMPLETE_REASSIGNED
-        ]
-
-        if instance.status not in pending_statuses:
+        if instance.status not in Inspection.OPEN_STATUSES:
             return Response({
                 'error': 'This form has already been submitted'
             }, status=status.HTTP_400_BAD_REQUEST)
@@ -287,59 +215,17 @@ class InspectionRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer.save()
-
-        # Get inspection data again
-        inspection = Inspection.objects.get(pk=instance.pk)
-        inspection_serializer = self.get_serializer(inspection)
-
-        # Store Inspection Notification
-        inspection_notification = InspectionNotification(
-            inspection=inspection,
-            title=inspection.distributor.name + ' visit score is ' + str(inspection.total_mark) + '%',
-            role='supervisor',
-            generated_by=request.user
-        )
-        inspection_notification.save()
-
-        # Store Inspection Log
-        inspection_log = InspectionLog(
-            inspection=inspection,
-            title=inspection.distributor.name + ' visit score is ' + str(inspection.total_mark) + '%',
-            subtitle='',
-            generated_by=InspectionLog.GEN_BY_SYSTEM,
-            user=request.user,
-            type=InspectionLog.TYPE_INFO,
-            # action_name=None,
-            # action_type=None
-        )
-        inspection_log.save()
-
-        # Generate Fine for lower score TODO: load mark and amount from DB
-        if inspection.total_mark < 80:
-            distributor_warning = DistributorWarning(
-                distributor=inspection.distributor,
-                amount=500,
-                account_manager=inspection.account_manager,
-                type=DistributorWarning.TYPE_GENERATED,
-                status=DistributorWarning.STATUS_PENDING
-            )
-            distributor_warning.save()
-
-            # Store Warning Log
-            warning_log = WarningLog(
-                distributor_warning=distributor_warning,
-                title=distributor_warning.distributor.name + ' has been fined SR ' + str(distributor_warning.amount),
-                subtitle='',
-                generated_by=WarningLog.GEN_BY_SYSTEM,
-                user=request.user,
-                type=WarningLog.TYPE_INFO,
-                # action_name=None,
-                # action_type=None
-            )
-            warning_log.save()
+        # Notifications, logs and fines are created from the outbox by the process_outbox job
+        try:
+            with transaction.atomic():
+                serializer.save()
+                record_submission(instance, request.user)
+        except VersionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
 
-            distributor_warning.notifications.add(inspection_notification)
+        inspection_serializer = self.get_serializer(instance)
 
         return Response({
             'message': 'Successfully updated',
@@ -349,13 +235,15 @@ class InspectionRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
 
-        if instance.status != Inspection.STATUS_INCOMPLETE:
+        if instance.get_effective_status() != Inspection.STATUS_INCOMPLETE:
             return Response({
                 'error': 'Only incomplete inspections can be deleted'
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            instance.delete()
+            with transaction.atomic():
+                record_deleted_inspections(Inspection.objects.filter(pk=instance.pk))
+                instance.delete()
         except Exception as e:
             return Response({
                 'error': 'Some error occurred'
@@ -366,6 +254,54 @@ class InspectionRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
         }, status=status.HTTP_200_OK)
 
 
+class InspectionChangesAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Delta feed for the inspector app. Pass the cursor of the previous response as ``since``.
+        """
+        since = request.query_params.get('since')
+
+        if since:
+            try:
+                since = decode_cursor(since)
+            except ValueError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = get_changes(request.user, since or None)
+
+        return Response({
+            'message': 'Success',
+            **changes
+        }, status=status.HTTP_200_OK)
+
+
+class InspectionSyncAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Submit many completed inspections at once, e.g. when the app reconnects after working offline.
+        Checklist attachments can be sent as photo ids or as files in the same multipart request.
+        """
+        try:
+            submissions = parse_submissions(request.data)
+        except SyncError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results, submitted = sync_inspections(submissions, request.user, request.FILES)
+
+        return Response({
+            'message': 'Successfully submitted ' + str(len(submitted)) + ' of ' + str(len(results)) + ' inspections',
+            'inspections': results
+        }, status=status.HTTP_200_OK)
+
+
 class InspectionRetrievePdfAPIView(RetrieveAPIView):
     lookup_field = 'pk'
     serializer_class = InspectionSerializer
@@ -409,21 +345,52 @@ class InspectionActionUpdateAPIView(UpdateAPIView):
                 'error': 'You are not authorized to take this action'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        instance = self.get_object()
+        try:
+            version = parse_version(request.data.get('version'))
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Version must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        references = {
+            'account_image': ('account_image', Photo, 'Photo not found'),
+            'reassign': ('inspector_id', User, 'Inspector not found'),
+        }
+        field, model, message = references.get(request.data.get('action'), (None, None, None))
 
-        if request.data.get('action') == 'account_image':
-            if request.data.get('account_image'):
-                instance.account_manager_image = Photo.objects.get(pk=request.data.get('account_image'))
-        elif request.data.get('action') == 'reassign':
-            if request.data.get('inspector_id'):
-                instance.inspector_id = request.data.get('inspector_id')
-                instance.status = Inspection.STATUS_INCOMPLETE_REASSIGNED
-        elif request.data.get('action') == 'set_reminder':
-            instance.status = Inspection.STATUS_INCOMPLETE_NOTIFIED
+        if field is not None and request.data.get(field) and not reference_exists(model, request.data.get(field)):
+            return Response({
+                'error': message
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        instance.save()
+        queryset = self.get_queryset().filter(pk=self.kwargs[self.lookup_field])
 
-        serializer = self.get_serializer(instance)
+        try:
+            if request.data.get('action') == 'account_image':
+                if request.data.get('account_image'):
+                    transition(queryset, version, account_manager_image_id=request.data.get('account_image'))
+            elif request.data.get('action') == 'reassign':
+                if request.data.get('inspector_id'):
+                    inspector_id = request.data.get('inspector_id')
+                    previous_inspector_id = queryset.values_list('inspector_id', flat=True).first()
+
+                    with transaction.atomic():
+                        transition(
+                            queryset, version, Inspection.OPEN_STATUSES,
+                            inspector_id=inspector_id,
+                            status=Inspection.STATUS_INCOMPLETE_REASSIGNED
+                        )
+
+                        if previous_inspector_id and str(previous_inspector_id) != str(inspector_id):
+                            record_unassigned(Tombstone.MODEL_INSPECTION, self.kwargs['pk'], previous_inspector_id)
+            elif request.data.get('action') == 'set_reminder':
+                transition(queryset, version, Inspection.OPEN_STATUSES, status=Inspection.STATUS_INCOMPLETE_NOTIFIED)
+        except VersionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
+
+        serializer = self.get_serializer(self.get_object())
 
         return Response({
             'message': 'Success',
@@ -436,9 +403,10 @@ class InspectionActionUpdateAPIView(UpdateAPIView):
 # Updated status (incomplete_notify, incomplete_reassign, )
 
 
-class InspectionNotificationListAPIView(ListAPIView):
+class InspectionNotificationListAPIView(ConditionalGetMixin, QueryPlanMixin, ListAPIView):
     queryset = InspectionNotification.objects.all()
     serializer_class = InspectionNotificationListSerializer
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.OrderingFilter]
 
@@ -471,6 +439,12 @@ class InspectionNotificationListAPIView(ListAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
+        not_modified = self.get_not_modified(queryset)
+
+        if not_modified is not None:
+            return not_modified
+
+        queryset = self.plan_queryset(queryset)
         inspection_filter = InspectionNotificationFilterSet(request.query_params, queryset=queryset)
         page = self.paginate_queryset(inspection_filter.qs)
         serializer = self.get_serializer(page, many=True)
@@ -483,9 +457,10 @@ class InspectionNotificationListAPIView(ListAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class InspectionNotificationLogListAPIView(ListAPIView):
+class InspectionNotificationLogListAPIView(ConditionalGetMixin, QueryPlanMixin, ListAPIView):
     queryset = InspectionLog.objects.all()
     serializer_class = InspectionLogListSerializer
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.OrderingFilter]
 
@@ -498,11 +473,19 @@ class InspectionNotificationLogListAPIView(ListAPIView):
         return queryset.order_by('created')
 
     def list(self, request, *args, **kwargs):
+        # Exports read the nested inspection and user
+        fieldset = {'fields': '', 'expand': '*'} if request.query_params.get('export') == 'true' else {}
         queryset = self.get_queryset()
+        not_modified = self.get_not_modified(queryset, **fieldset)
+
+        if not_modified is not None:
+            return not_modified
+
+        queryset = self.plan_queryset(queryset, **fieldset)
         inspection_filter = InspectionLogFilterSet(request.query_params, queryset=queryset)
 
         if request.query_params.get('export') == 'true':
-            serializer = self.get_serializer(inspection_filter.qs, many=True)
+            serializer = self.get_serializer(inspection_filter.qs, many=True, **fieldset)
 
             if request.query_params.get('action_type') == 'manager':
                 return self.export_list_escalation(data=serializer.data)
@@ -593,81 +576,61 @@ class InspectionNotificationActionUpdateAPIView(UpdateAPIView):
                 'error': 'You are not authorized to take this action'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        instance = self.get_object()
+        # Role the notification must still be at, role it moves to, log title, log type and log action type
+        transitions = {
+            'supervisor_approve': (
+                'supervisor', 'manager', 'Approved by Supervisor', InspectionLog.TYPE_SUCCESS, 'manager'
+            ),
+            'supervisor_reject': (
+                'supervisor', None, 'Rejected by Supervisor', InspectionLog.TYPE_ERROR, 'supervisor'
+            ),
+            'manager_approve': (
+                'manager', 'account', 'Approved by QA Manager', InspectionLog.TYPE_SUCCESS, 'account'
+            ),
+            'manager_reject': (
+                'manager', 'supervisor', 'Rejected by QA Manager', InspectionLog.TYPE_ERROR, 'manager'
+            ),
+        }
+        allowed, role, title, log_type, action_type = transitions[request.data.get('action')]
 
-        if request.data.get('action') == 'supervisor_approve':
-            instance.role = 'manager'
-            instance.save()
-
-            # Store Inspection Log
-            inspection_log = InspectionLog(
-                inspection=instance.inspection,
-                title='Approved by Supervisor',
-                subtitle='',
-                generated_by=InspectionLog.GEN_BY_USER,
-                user=request.user,
-                type=InspectionLog.TYPE_SUCCESS,
-                action_type='manager'
-            )
-            inspection_log.save()
-        elif request.data.get('action') == 'supervisor_reject':
-            if request.data.get('reject_reason') is None:
-                return Response({
-                    'error': 'A specific reason is required'
-                }, status=status.HTTP_400_BAD_REQUEST)
+        if request.data.get('action').endswith('_reject') and request.data.get('reject_reason') is None:
+            return Response({
+                'error': 'A specific reason is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            instance.role = None
-            instance.save()
-
-            # Store Inspection Log
-            inspection_log = InspectionLog(
-                inspection=instance.inspection,
-                title='Rejected by Supervisor',
-                subtitle=request.data.get('reject_reason'),
-                generated_by=InspectionLog.GEN_BY_USER,
-                user=request.user,
-                type=InspectionLog.TYPE_ERROR,
-                action_type='supervisor'
-            )
-            inspection_log.save()
-        elif request.data.get('action') == 'manager_approve':
-            instance.role = 'account'
-            instance.save()
-
-            # Store Inspection Log
-            inspection_log = InspectionLog(
-                inspection=instance.inspection,
-                title='Approved by QA Manager',
-                subtitle='',
-                generated_by=InspectionLog.GEN_BY_USER,
-                user=request.user,
-                type=InspectionLog.TYPE_SUCCESS,
-                action_type='account'
-            )
-            inspection_log.save()
-        elif request.data.get('action') == 'manager_reject':
-            if request.data.get('reject_reason') is None:
-                return Response({
-                    'error': 'A specific reason is required'
-                }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            version = parse_version(request.data.get('version'))
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Version must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            instance.role = 'supervisor'
-            instance.save()
-
-            # Store Inspection Log
-            inspection_log = InspectionLog(
-                inspection=instance.inspection,
-                title='Rejected by QA Manager',
-                subtitle=request.data.get('reject_reason'),
-                generated_by=InspectionLog.GEN_BY_USER,
-                user=request.user,
-                type=InspectionLog.TYPE_ERROR,
-                action_type='manager'
-            )
-            inspection_log.save()
+        inspection_id = self.kwargs[self.lookup_field]
+
+        try:
+            with transaction.atomic():
+                transition(
+                    self.get_queryset().filter(inspection_id=inspection_id), version, [allowed], 'role', role=role
+                )
+
+                # Store Inspection Log
+                InspectionLog.objects.create(
+                    inspection_id=inspection_id,
+                    title=title,
+                    subtitle=request.data.get('reject_reason') or '',
+                    generated_by=InspectionLog.GEN_BY_USER,
+                    user=request.user,
+                    type=log_type,
+                    action_type=action_type
+                )
+        except VersionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
 
         return Response({
-            'message': 'Successfully updated action'
+            'message': 'Successfully updated action',
+            'version': version + 1 if version is not None else None
         }, status=status.HTTP_200_OK)
 
 
@@ -708,9 +671,7 @@ class InspectionChecklistListView(ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def list(self, request, *args, **kwargs):
-        serializer = self.get_serializer(self.get_queryset(), many=True)
-
         return Response({
             'message': 'Success',
-            'checklists': serializer.data
+            'checklists': get_checklist_data()
         }, status=status.HTTP_200_OK)
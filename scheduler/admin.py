@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import JobRun
+
+
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ('name', 'schema_name', 'status', 'started', 'duration')
+    list_filter = ('name', 'status', 'schema_name')
+    list_per_page = 20
+    search_fields = ('name', 'schema_name')
+
+
+admin.site.register(JobRun, JobRunAdmin)
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+
+class CronSchedule:
+    """
+    A five field cron expression: minute, hour, day of month, month and day of week (0 or 7 is Sunday).
+
+    Fields accept ``*``, single values, ``a-b`` ranges, ``/step`` suffixes and comma separated lists. As in
+    cron, when both day fields are restricted a time matches if either of them does.
+    """
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+
+        if len(fields) != 5:
+            raise ValueError('Cron expression "%s" must have five fields' % expression)
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self.parse_field(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        ]
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def parse_field(field, low, high):
+        values = set()
+
+        for part in field.split(','):
+            step = 1
+
+            if '/' in part:
+                part, step = part.split('/')
+                step = int(step)
+
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = [int(value) for value in part.split('-')]
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError('Cron field "%s" is out of range %d-%d' % (field, low, high))
+
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def matches_day(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+
+        if self.any_day or self.any_weekday:
+            return day and weekday
+
+        return day or weekday
+
+    def matches(self, moment):
+        return (
+            moment.minute in self.minutes and
+            moment.hour in self.hours and
+            moment.month in self.months and
+            self.matches_day(moment)
+        )
+
+    def next_after(self, moment):
+        """
+        Return the first matching minute strictly after ``moment``, searching at most four years ahead.
+        """
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=4 * 366)
+
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.matches_day(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+
+        raise ValueError('Cron expression "%s" never matches' % self.expression)
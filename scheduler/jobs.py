@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .cron import CronSchedule
+
+
+class Job:
+    """
+    A scheduled task built from one entry of ``settings.SCHEDULER_JOBS``.
+
+    ``task`` is the dotted path of a function returning its row counts. Per-tenant jobs run once in every
+    tenant schema, with start offsets spread over ``jitter`` seconds so tenants do not all hit the database
+    in the same second.
+    """
+
+    def __init__(self, name, cron, task, per_tenant=True, jitter=0, kwargs=None):
+        self.name = name
+        self.schedule = CronSchedule(cron)
+        self.task = task
+        self.per_tenant = per_tenant
+        self.jitter = jitter
+        self.kwargs = kwargs or {}
+
+    def __str__(self):
+        return '%s [%s]' % (self.name, self.schedule.expression)
+
+
+def get_jobs():
+    return [Job(**definition) for definition in getattr(settings, 'SCHEDULER_JOBS', [])]
+
+
+def run_task(task, kwargs):
+    return import_string(task)(**kwargs)
@@ -0,0 +1,102 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+from clients.runner import get_tenant_schemas, run_for_tenants
+from scheduler.jobs import get_jobs, run_task
+from scheduler.models import JobRun
+
+# Key of the session level advisory lock that keeps a single scheduler running per database
+LOCK_KEY = 4732001
+
+
+class Command(BaseCommand):
+    help = 'Run the scheduled batch jobs defined in SCHEDULER_JOBS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes per job')
+        parser.add_argument('--run', dest='job_name', help='Run this job once now and exit')
+        parser.add_argument('--lock-retry', type=int, default=30, help='Seconds between lock attempts')
+
+    def handle(self, *args, **options):
+        jobs = {job.name: job for job in get_jobs()}
+
+        if options['job_name'] is not None:
+            if options['job_name'] not in jobs:
+                raise CommandError('Unknown job "%s"' % options['job_name'])
+
+            self.run_job(jobs[options['job_name']], options['workers'])
+
+            return
+
+        lock = self.acquire_lock(options['lock_retry'])
+
+        try:
+            self.loop(list(jobs.values()), options['workers'])
+        finally:
+            lock.close()
+
+    def acquire_lock(self, retry):
+        # A connection of its own, so closing the Django connections before forking workers keeps the lock
+        lock = connection.get_new_connection(connection.get_connection_params())
+        lock.autocommit = True
+
+        while True:
+            with lock.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [LOCK_KEY])
+
+                if cursor.fetchone()[0]:
+                    self.stdout.write(self.style.SUCCESS('Scheduler lock acquired'))
+
+                    return lock
+
+            self.stdout.write('Another scheduler holds the lock, retrying in %ds' % retry)
+            time.sleep(retry)
+
+    def loop(self, jobs, workers):
+        now = timezone.now()
+        next_runs = {job.name: job.schedule.next_after(now) for job in jobs}
+
+        for job in jobs:
+            self.stdout.write('%s next run at %s' % (job, next_runs[job.name].isoformat()))
+
+        while True:
+            now = timezone.now()
+
+            for job in jobs:
+                if next_runs[job.name] <= now:
+                    self.run_job(job, workers)
+                    next_runs[job.name] = job.schedule.next_after(timezone.now())
+
+            time.sleep(max(1, (min(next_runs.values()) - timezone.now()).total_seconds()))
+
+    def run_job(self, job, workers):
+        started = timezone.now()
+
+        if job.per_tenant:
+            schema_names = get_tenant_schemas()
+        else:
+            schema_names = [get_public_schema_name()]
+
+        runs = list(run_for_tenants(
+            run_task, schema_names, job.task, job.kwargs, workers=workers, stagger=job.jitter
+        ))
+
+        JobRun.objects.bulk_create([
+            JobRun(
+                name=job.name,
+                schema_name=run.schema_name,
+                status=JobRun.STATUS_ERROR if run.error is not None else JobRun.STATUS_SUCCESS,
+                started=started,
+                duration=run.elapsed,
+                result=run.result,
+                error=run.error
+            )
+            for run in runs
+        ])
+
+        failed = sum(1 for run in runs if run.error is not None)
+        self.stdout.write('%s finished for %d schemas (%d failed) in %.2fs' % (
+            job.name, len(runs), failed, (timezone.now() - started).total_seconds()
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.10 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64)),
+                ('schema_name', models.CharField(max_length=63)),
+                ('status', models.CharField(choices=[('scs', 'Success'), ('err', 'Error')], max_length=3)),
+                ('started', models.DateTimeField()),
+                ('duration', models.FloatField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-started'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='jobrun',
+            index=models.Index(fields=['name', '-started'], name='scheduler_j_name_8976fd_idx'),
+        ),
+    ]
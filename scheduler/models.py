@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class JobRun(models.Model):
+    # STATUS CHOICES
+    STATUS_SUCCESS = 'scs'
+    STATUS_ERROR = 'err'
+
+    STATUS_CHOICES = [
+        (STATUS_SUCCESS, 'Success'),
+        (STATUS_ERROR, 'Error'),
+    ]
+
+    # DATABASE FIELDS
+    name = models.CharField(max_length=64)
+    schema_name = models.CharField(max_length=63)
+    status = models.CharField(max_length=3, choices=STATUS_CHOICES)
+    started = models.DateTimeField()
+    duration = models.FloatField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '%s (%s)' % (self.name, self.schema_name)
+
+    class Meta:
+        ordering = ['-started']
+        indexes = [
+            models.Index(fields=['name', '-started']),
+        ]
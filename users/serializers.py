@@ -5,7 +5,9 @@ from rest_framework.fields import CharField, EmailField, FileField
 from photo.models import Photo
 from photo.serializers import PhotoSerializer
 from distributors.models import Distributor
+from inspections.tombstones import record_reassignment
 from django.contrib.auth.models import Group
+from django.utils import timezone
 
 
 class UserGenericSerializer(serializers.ModelSerializer):
@@ -101,12 +103,16 @@ class UserCreateSerializer(serializers.ModelSerializer):
         if validated_data.get('distributor_ids') is not None:
             distributor_ids = validated_data.get('distributor_ids').split(',')
 
+            record_reassignment(user.pk, distributor_ids)
+
             Distributor.objects.filter(inspector_id=user.pk).update(
-                inspector_id=None
+                inspector_id=None,
+                updated=timezone.now()
             )
 
             Distributor.objects.filter(pk__in=distributor_ids).update(
-                inspector_id=user.pk
+                inspector_id=user.pk,
+                updated=timezone.now()
             )
 
         return user
@@ -156,12 +162,16 @@ class UserDetailSerializer(serializers.ModelSerializer):
         if validated_data.get('distributor_ids') is not None:
             distributor_ids = validated_data.get('distributor_ids').split(',')
 
+            record_reassignment(instance.pk, distributor_ids)
+
             Distributor.objects.filter(inspector_id=instance.pk).update(
-                inspector_id=None
+                inspector_id=None,
+                updated=timezone.now()
             )
 
             Distributor.objects.filter(pk__in=distributor_ids).update(
-                inspector_id=instance.pk
+                inspector_id=instance.pk,
+                updated=timezone.now()
             )
 
         return instance
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import UserListCreateAPIView, UserRetrieveUpdateDestroyAPIView
+from .views import UserListCreateAPIView, UserLookupAPIView, UserRetrieveUpdateDestroyAPIView
 
 urlpatterns = [
     path('', UserListCreateAPIView.as_view(), name='users-list'),
+    path('lookup', UserLookupAPIView.as_view(), name='users-lookup'),
     path('<pk>', UserRetrieveUpdateDestroyAPIView.as_view(), name='users_detail'),
 ]
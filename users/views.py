@@ -1,11 +1,13 @@
 from rest_framework import filters, permissions
 from rest_framework.response import Response
 from rest_framework.generics import (
+    ListAPIView,
     ListCreateAPIView,
     RetrieveUpdateDestroyAPIView
 )
 from rest_framework import status
 from auth.models import User
+from gbqa.mixins import QueryPlanMixin, StreamingListMixin, TypeaheadMixin
 from .serializers import (
     UserListSerializer,
     UserCreateSerializer,
@@ -23,7 +25,7 @@ role_lang = {
     'supervisor': 'مشرف',
 }
 
-class UserListCreateAPIView(ListCreateAPIView):
+class UserListCreateAPIView(QueryPlanMixin, StreamingListMixin, ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserListSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -49,7 +51,7 @@ class UserListCreateAPIView(ListCreateAPIView):
             return UserCreateSerializer
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         user_filter = UserFilterSet(request.query_params, queryset=queryset)
 
         if request.query_params.get('export') == 'true':
@@ -57,21 +59,17 @@ class UserListCreateAPIView(ListCreateAPIView):
 
             return self.export_list(data=serializer.data)
 
+        if request.query_params.get('pagination') == 'false':
+            return self.stream_list('users', user_filter.qs)
+
         page = self.paginate_queryset(user_filter.qs)
         serializer = self.get_serializer(page, many=True)
         paginated_data = self.get_paginated_response(serializer.data)
 
-        if request.query_params.get('pagination') == 'false':
-            data = self.get_serializer(user_filter.qs, many=True).data
-            pagination = None
-        else:
-            data = paginated_data.data['results']
-            pagination = paginated_data.data['pagination']
-
         return Response({
             'message': 'Success',
-            'users': data,
-            'pagination': pagination
+            'users': paginated_data.data['results'],
+            'pagination': paginated_data.data['pagination']
         }, status=status.HTTP_200_OK)
 
     @staticmethod
@@ -136,6 +134,27 @@ class UserListCreateAPIView(ListCreateAPIView):
         }, status=status.HTTP_200_OK)
 
 
+class UserLookupAPIView(TypeaheadMixin, ListAPIView):
+    queryset = User.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+    typeahead_key = 'users'
+    typeahead_fields = ['first_name']
+    typeahead_label = 'first_name'
+
+    def get_queryset(self):
+        user_type = self.request.query_params.get('type', None)
+
+        if user_type is not None:
+            queryset = User.objects.filter(groups__name=user_type)
+        else:
+            queryset = User.objects.all()
+
+        return queryset.exclude(is_superuser=True)
+
+    def list(self, request, *args, **kwargs):
+        return self.typeahead(self.get_queryset())
+
+
 class UserRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     lookup_field = 'pk'
     serializer_class = UserDetailSerializer